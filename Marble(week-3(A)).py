@@ -1,4 +1,8 @@
 import heapq
+import itertools
+import multiprocessing
+import queue
+import sys
 import time
 
 
@@ -23,7 +27,24 @@ FINAL_SIMPLE_BOARD = [
     [-1, -1, -1, -1, -1, -1, -1],
 ]
 
+# 37-hole French board. No single-vacancy start can end in the center on this
+# board (see position classes below), so it is played to FRENCH_GOAL_POS.
+FRENCH_BOARD_STATE = [
+    [-1, -1, 1, 1, 1, -1, -1],
+    [-1,  1, 1, 1, 1,  1, -1],
+    [ 1,  1, 1, 0, 1,  1,  1],
+    [ 1,  1, 1, 1, 1,  1,  1],
+    [ 1,  1, 1, 1, 1,  1,  1],
+    [-1,  1, 1, 1, 1,  1, -1],
+    [-1, -1, 1, 1, 1, -1, -1],
+]
+FRENCH_GOAL_POS = (4, 3)
+
 BOARD_CENTER = (3, 3)
+BOARD_SIZE = 7
+BOARD_LAYOUT = INITIAL_BOARD_STATE
+GOAL_POS = BOARD_CENTER
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
 
 def get_marbles(board_state):
 
@@ -36,15 +57,301 @@ def get_marbles(board_state):
 
 def is_valid_pos(r, c):
 
-    return 0 <= r < 7 and 0 <= c < 7 and INITIAL_BOARD_STATE[r][c] != -1
+    return 0 <= r < 7 and 0 <= c < 7 and BOARD_LAYOUT[r][c] != -1
+
+
+# Bitboard mode: a state is a single int with bit r*7+c set for each marble
+# (49 bits on the 7x7 grid, 33 of them usable on the English board).
+
+def pos_bit(r, c):
+
+    return 1 << (r * BOARD_SIZE + c)
+
+def build_jump_masks():
+
+    # One (required, dest, flip) triple per legal (from, over, to) jump.
+    jumps = []
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            if not is_valid_pos(r, c):
+                continue
+            for dr, dc in DIRECTIONS:
+                jumped_r, jumped_c = r + dr, c + dc
+                dest_r, dest_c = r + 2 * dr, c + 2 * dc
+                if is_valid_pos(jumped_r, jumped_c) and is_valid_pos(dest_r, dest_c):
+                    required = pos_bit(r, c) | pos_bit(jumped_r, jumped_c)
+                    dest = pos_bit(dest_r, dest_c)
+                    jumps.append((required, dest, required | dest))
+    return jumps
+
+JUMP_MASKS = build_jump_masks()
+GOAL_BIT = pos_bit(*GOAL_POS)
+
+def to_bitboard(marbles):
+
+    bits = 0
+    for r, c in marbles:
+        bits |= pos_bit(r, c)
+    return bits
+
+def get_bitboard(board_state):
+
+    return to_bitboard(get_marbles(board_state))
+
+def marble_positions(marbles):
+
+    if not isinstance(marbles, int):
+        return marbles
+    positions = []
+    while marbles:
+        low = marbles & -marbles
+        r, c = divmod(low.bit_length() - 1, BOARD_SIZE)
+        positions.append((r, c))
+        marbles ^= low
+    return positions
+
+def from_bitboard(bits):
+
+    return frozenset(marble_positions(bits))
+
+def count_marbles(marbles):
 
-def generate_moves(marbles):
+    if isinstance(marbles, int):
+        return marbles.bit_count()
+    return len(marbles)
+
+def is_goal(marbles):
+
+    if isinstance(marbles, int):
+        return marbles == GOAL_BIT
+    return len(marbles) == 1 and GOAL_POS in marbles
+
+# Dihedral symmetries of the 7x7 grid about the center hole. Only the ones
+# that map the board onto itself and fix the goal hole are used.
+TRANSFORMS = [
+    lambda r, c: (r, c),
+    lambda r, c: (c, 6 - r),
+    lambda r, c: (6 - r, 6 - c),
+    lambda r, c: (6 - c, r),
+    lambda r, c: (r, 6 - c),
+    lambda r, c: (6 - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (6 - c, 6 - r),
+]
+
+def build_symmetry_tables():
+
+    # For each symmetry, a per-row lookup from the row's 7 bits to the
+    # transformed mask, so a whole board maps with 7 table lookups.
+    holes = [(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE) if is_valid_pos(r, c)]
+    tables = []
+    for transform in TRANSFORMS:
+        if not all(is_valid_pos(*transform(r, c)) for r, c in holes):
+            continue
+        if transform(*GOAL_POS) != GOAL_POS:
+            continue
+        row_tables = []
+        for r in range(BOARD_SIZE):
+            row_table = []
+            for row_bits in range(1 << BOARD_SIZE):
+                mask = 0
+                for c in range(BOARD_SIZE):
+                    if row_bits >> c & 1 and is_valid_pos(r, c):
+                        mask |= pos_bit(*transform(r, c))
+                row_table.append(mask)
+            row_tables.append(row_table)
+        tables.append(row_tables)
+    return tables
+
+SYMMETRY_TABLES = build_symmetry_tables()
+ROW_MASK = (1 << BOARD_SIZE) - 1
+
+def transform_bitboard(bits, row_tables):
+
+    result = 0
+    for row_table in row_tables:
+        result |= row_table[bits & ROW_MASK]
+        bits >>= BOARD_SIZE
+    return result
+
+def canonical_key(marbles):
+
+    # Smallest bitboard among all symmetric variants of the state.
+    bits = marbles if isinstance(marbles, int) else to_bitboard(marbles)
+    return min(transform_bitboard(bits, row_tables) for row_tables in SYMMETRY_TABLES)
+
+# Pagoda functions: weights with w(from) + w(over) >= w(to) for every jump, so
+# the weighted sum of a position can never grow. A state whose sum is already
+# below the goal's can never reach the goal. Entries off the board are unused.
+PAGODA_GRIDS = [
+    [
+        [ 0,  0, -1,  0, -1,  0,  0],
+        [ 0,  0,  1,  1,  1,  0,  0],
+        [-1,  1,  0,  1,  0,  1, -1],
+        [ 0,  1,  1,  2,  1,  1,  0],
+        [-1,  1,  0,  1,  0,  1, -1],
+        [ 0,  0,  1,  1,  1,  0,  0],
+        [ 0,  0, -1,  0, -1,  0,  0],
+    ],
+    [
+        [ 0,  0, -1,  0, -1,  0,  0],
+        [ 0,  0,  1,  3,  1,  0,  0],
+        [ 0,  0,  0,  0,  0,  0,  0],
+        [ 0,  2,  1,  3,  1,  2,  0],
+        [ 0,  0,  0,  0,  0,  0,  0],
+        [ 0,  0,  1,  3,  1,  0,  0],
+        [ 0,  0, -1,  0, -1,  0,  0],
+    ],
+    [
+        [ 0,  0,  0,  0,  0,  0,  0],
+        [ 0,  0,  0,  1,  0,  0,  0],
+        [-1,  1,  0,  1,  0,  1, -1],
+        [ 0,  0,  0,  0,  0,  0,  0],
+        [-1,  1,  0,  1,  0,  1, -1],
+        [ 0,  0,  0,  1,  0,  0,  0],
+        [ 0,  0,  0,  0,  0,  0,  0],
+    ],
+    [
+        [ 0,  0, -1,  0, -1,  0,  0],
+        [ 0,  0,  1,  0,  1,  0,  0],
+        [ 0,  0,  0,  0,  0,  0,  0],
+        [ 0,  1,  1,  0,  1,  1,  0],
+        [ 0,  0,  0,  0,  0,  0,  0],
+        [ 0,  0,  1,  0,  1,  0,  0],
+        [ 0,  0, -1,  0, -1,  0,  0],
+    ],
+]
+
+def is_pagoda(weights):
+
+    return all(
+        sum(weights[r][c] for r, c in marble_positions(required)) >= sum(weights[r][c] for r, c in marble_positions(dest))
+        for required, dest, _ in JUMP_MASKS
+    )
+
+def build_pagodas():
+
+    # Every board symmetry of a valid pagoda is a pagoda too; keep each once.
+    pagodas = []
+    for grid in PAGODA_GRIDS:
+        for transform in TRANSFORMS:
+            weights = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+            for r in range(BOARD_SIZE):
+                for c in range(BOARD_SIZE):
+                    tr, tc = transform(r, c)
+                    weights[tr][tc] = grid[r][c]
+            if weights not in pagodas and is_pagoda(weights):
+                pagodas.append(weights)
+    return pagodas
+
+def build_weight_tables(weights):
+
+    # Per-row lookup from the row's 7 bits to the sum of their weights.
+    row_tables = []
+    for r in range(BOARD_SIZE):
+        row_table = []
+        for row_bits in range(1 << BOARD_SIZE):
+            row_table.append(sum(weights[r][c] for c in range(BOARD_SIZE) if row_bits >> c & 1 and is_valid_pos(r, c)))
+        row_tables.append(row_table)
+    return row_tables
+
+def weighted_sum(bits, row_tables):
+
+    total = 0
+    for row_table in row_tables:
+        total += row_table[bits & ROW_MASK]
+        bits >>= BOARD_SIZE
+    return total
+
+PAGODAS = build_pagodas()
+PAGODA_TABLES = [build_weight_tables(weights) for weights in PAGODAS]
+PAGODA_GOAL_VALUES = [weights[GOAL_POS[0]][GOAL_POS[1]] for weights in PAGODAS]
+JUMP_PAGODA_DELTAS = [
+    tuple(weighted_sum(dest, row_tables) - weighted_sum(required, row_tables) for row_tables in PAGODA_TABLES)
+    for required, dest, _ in JUMP_MASKS
+]
+
+def pagoda_values(marbles):
+
+    bits = marbles if isinstance(marbles, int) else to_bitboard(marbles)
+    return [weighted_sum(bits, row_tables) for row_tables in PAGODA_TABLES]
+
+def is_pagoda_dead(marbles):
+
+    return any(value < goal for value, goal in zip(pagoda_values(marbles), PAGODA_GOAL_VALUES))
+
+# Position classes: label holes by (r + c) % 3 and by (r - c) % 3. A jump
+# touches one hole of each label, so the parities of the three counts flip
+# together, and a state with different pairwise parities from the goal is
+# unsolvable. This is invariant under jumps, so checking the root is enough.
+POSITION_CLASS_MASKS = [
+    [sum(pos_bit(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE) if (r + sign * c) % 3 == k) for k in range(3)]
+    for sign in (1, -1)
+]
+
+def position_class(marbles):
+
+    bits = marbles if isinstance(marbles, int) else to_bitboard(marbles)
+    signature = []
+    for masks in POSITION_CLASS_MASKS:
+        counts = [(bits & mask).bit_count() for mask in masks]
+        signature.append(((counts[0] + counts[1]) % 2, (counts[1] + counts[2]) % 2))
+    return tuple(signature)
+
+GOAL_POSITION_CLASS = position_class(GOAL_BIT)
+
+def use_board(board_state, goal_pos=BOARD_CENTER):
+
+    # Switch the module to another board layout and goal hole (e.g.
+    # FRENCH_BOARD_STATE and FRENCH_GOAL_POS) and rebuild every table that
+    # depends on them.
+    global BOARD_LAYOUT, GOAL_POS, GOAL_BIT, GOAL_POSITION_CLASS
+    global JUMP_MASKS, SYMMETRY_TABLES, PAGODAS, PAGODA_TABLES, PAGODA_GOAL_VALUES, JUMP_PAGODA_DELTAS
+    BOARD_LAYOUT = board_state
+    GOAL_POS = goal_pos
+    GOAL_BIT = pos_bit(*goal_pos)
+    GOAL_POSITION_CLASS = position_class(GOAL_BIT)
+    JUMP_MASKS = build_jump_masks()
+    JUMP_WEIGHT_DELTAS.clear()
+    SYMMETRY_TABLES = build_symmetry_tables()
+    PAGODAS = build_pagodas()
+    PAGODA_TABLES = [build_weight_tables(weights) for weights in PAGODAS]
+    PAGODA_GOAL_VALUES = [weights[goal_pos[0]][goal_pos[1]] for weights in PAGODAS]
+    JUMP_PAGODA_DELTAS = [
+        tuple(weighted_sum(dest, row_tables) - weighted_sum(required, row_tables) for row_tables in PAGODA_TABLES)
+        for required, dest, _ in JUMP_MASKS
+    ]
+
+def is_dead_state(marbles):
+
+    return position_class(marbles) != GOAL_POSITION_CLASS or is_pagoda_dead(marbles)
+
+def generate_moves_bitboard(bits, prune_dead=False):
 
     moves = []
-    directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-    
+    if not prune_dead:
+        for required, dest, flip in JUMP_MASKS:
+            if bits & required == required and not bits & dest:
+                moves.append(bits ^ flip)
+        return moves
+
+    # The child's pagoda sums are the parent's plus a per-jump delta.
+    values = pagoda_values(bits)
+    for (required, dest, flip), deltas in zip(JUMP_MASKS, JUMP_PAGODA_DELTAS):
+        if bits & required == required and not bits & dest:
+            if all(value + delta >= goal for value, delta, goal in zip(values, deltas, PAGODA_GOAL_VALUES)):
+                moves.append(bits ^ flip)
+    return moves
+
+def generate_moves(marbles, prune_dead=False):
+
+    if isinstance(marbles, int):
+        return generate_moves_bitboard(marbles, prune_dead)
+
+    moves = []
+
     for r, c in marbles:
-        for dr, dc in directions:
+        for dr, dc in DIRECTIONS:
             jumped_r, jumped_c = r + dr, c + dc
             dest_r, dest_c = r + 2 * dr, c + 2 * dc
             
@@ -57,83 +364,471 @@ def generate_moves(marbles):
                 new_marbles.remove((jumped_r, jumped_c))
                 new_marbles.add((dest_r, dest_c))
                 moves.append(frozenset(new_marbles))
+    if prune_dead:
+        moves = [move for move in moves if not is_pagoda_dead(move)]
     return moves
 
+# Per-hole weights for heuristics that depend on a weighted sum of marbles. A
+# jump changes only three holes, so a child's sum is the parent's plus a
+# per-jump delta.
+DISTANCE_WEIGHTS = [[abs(r - BOARD_CENTER[0]) + abs(c - BOARD_CENTER[1]) for c in range(BOARD_SIZE)]
+                    for r in range(BOARD_SIZE)]
+UNIT_WEIGHTS = [[1] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+JUMP_WEIGHT_DELTAS = {}
+
+def jump_weight_deltas(weights):
+
+    # Weighted-sum change for each entry of JUMP_MASKS, built once per table.
+    cached = JUMP_WEIGHT_DELTAS.get(id(weights))
+    if cached is None or cached[0] is not weights:
+        deltas = [
+            sum(weights[r][c] for r, c in marble_positions(dest)) - sum(weights[r][c] for r, c in marble_positions(required))
+            for required, dest, _ in JUMP_MASKS
+        ]
+        cached = (weights, deltas)
+        JUMP_WEIGHT_DELTAS[id(weights)] = cached
+    return cached[1]
+
+def weight_sum(marbles, weights):
+
+    return sum(weights[r][c] for r, c in marble_positions(marbles))
+
+def generate_successors(marbles, weights, prune_dead=False):
+
+    # Like generate_moves, but returns (child, delta) pairs where delta is the
+    # change in weight_sum(child, weights) relative to the parent.
+    successors = []
+    if isinstance(marbles, int):
+        deltas = jump_weight_deltas(weights)
+        values = pagoda_values(marbles) if prune_dead else None
+        for index, (required, dest, flip) in enumerate(JUMP_MASKS):
+            if marbles & required == required and not marbles & dest:
+                if prune_dead and not all(value + delta >= goal for value, delta, goal
+                                          in zip(values, JUMP_PAGODA_DELTAS[index], PAGODA_GOAL_VALUES)):
+                    continue
+                successors.append((marbles ^ flip, deltas[index]))
+        return successors
+
+    for r, c in marbles:
+        for dr, dc in DIRECTIONS:
+            jumped_r, jumped_c = r + dr, c + dc
+            dest_r, dest_c = r + 2 * dr, c + 2 * dc
+            if (jumped_r, jumped_c) in marbles and \
+               is_valid_pos(dest_r, dest_c) and \
+               (dest_r, dest_c) not in marbles:
+                new_marbles = frozenset(marbles - {(r, c), (jumped_r, jumped_c)} | {(dest_r, dest_c)})
+                if prune_dead and is_pagoda_dead(new_marbles):
+                    continue
+                delta = weights[dest_r][dest_c] - weights[r][c] - weights[jumped_r][jumped_c]
+                successors.append((new_marbles, delta))
+    return successors
+
 
 
 def h1_marble_count(marbles):
  
-    return len(marbles) - 1
+    return count_marbles(marbles) - 1
 
 def h2_avg_distance_from_center(marbles):
 
     if not marbles:
         return 0
-    total_dist = sum(abs(r - BOARD_CENTER[0]) + abs(c - BOARD_CENTER[1]) for r, c in marbles)
-    return total_dist / len(marbles)
+    total_dist = weight_sum(marbles, DISTANCE_WEIGHTS)
+    return total_dist / count_marbles(marbles)
+
+# Incremental form: a heuristic with hole_weights and from_weight_sum is
+# evaluated by solve_solitaire from the parent's weighted sum plus the jump's
+# delta, as from_weight_sum(weight_sum, num_marbles), in O(1) per child.
+h1_marble_count.hole_weights = UNIT_WEIGHTS
+h1_marble_count.from_weight_sum = lambda total, num_marbles: num_marbles - 1
+h2_avg_distance_from_center.hole_weights = DISTANCE_WEIGHTS
+h2_avg_distance_from_center.from_weight_sum = lambda total, num_marbles: total / num_marbles if num_marbles else 0
     
 
 
-def solve_solitaire(initial_marbles, heuristic_func, algorithm):
-    
+# Rough per-entry costs (CPython, 64-bit) used to hold the search inside
+# memory_budget: a heap tuple, the two node-table slots, and an explored-set
+# slot. The state objects themselves are sized with sys.getsizeof.
+HEAP_ENTRY_BYTES = 80
+NODE_ENTRY_BYTES = 16
+EXPLORED_ENTRY_BYTES = 40
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+def combine_priority(algorithm, g_cost, h_value):
 
-    NODE_LIMIT = 500000 
-    
-    initial_g_cost = 0
-    initial_state = initial_marbles
-    
-    priority = 0
     if algorithm == 'GBFS':
-        priority = heuristic_func(initial_state)
+        return h_value
     elif algorithm == 'A*':
-        priority = initial_g_cost + heuristic_func(initial_state)
+        return g_cost + h_value
     elif algorithm == 'UCS':
-        priority = initial_g_cost
+        return g_cost
+    return 0
+
+def search_priority(algorithm, heuristic_func, g_cost, state):
+
+    h_value = heuristic_func(state) if algorithm != 'UCS' else 0
+    return combine_priority(algorithm, g_cost, h_value)
+
+def rebuild_path(node_states, node_parents, node_id):
+
+    path = []
+    while node_id != -1:
+        path.append(node_states[node_id])
+        node_id = node_parents[node_id]
+    path.reverse()
+    return path
 
-    frontier = [(priority, initial_g_cost, initial_state, [])]
+def solve_solitaire(initial_marbles, heuristic_func, algorithm, memory_budget=DEFAULT_MEMORY_BUDGET, use_symmetry=True,
+                    prune_dead=True):
+    
+    # Frontier entries are (priority, -g, node_id); the path is rebuilt from a parent table.
+    state_key = canonical_key if use_symmetry else (lambda marbles: marbles)
+    state_bytes = sys.getsizeof(initial_marbles)
+    key_bytes = sys.getsizeof(state_key(initial_marbles))
+    incremental = hasattr(heuristic_func, 'hole_weights')
+    node_entry_bytes = NODE_ENTRY_BYTES + (8 if incremental else 0)
+    
+    initial_g_cost = 0
+    node_states = [initial_marbles]
+    node_parents = [-1]
+    if incremental:
+        hole_weights = heuristic_func.hole_weights
+        node_weight_sums = [weight_sum(initial_marbles, hole_weights)]
+    priority = search_priority(algorithm, heuristic_func, initial_g_cost, initial_marbles)
+
+    frontier = [(priority, -initial_g_cost, 0)]
+    if prune_dead and is_dead_state(initial_marbles):
+        frontier = []
     explored = set()
     nodes_expanded = 0
+    peak_frontier = 1
+    estimated_bytes = 0
+    solution = None
 
     while frontier:
 
-        if nodes_expanded > NODE_LIMIT:
-            print(f"⚠️  Node limit of {NODE_LIMIT} exceeded. Stopping search.")
+        estimated_bytes = (len(node_states) * (node_entry_bytes + state_bytes)
+                           + len(frontier) * HEAP_ENTRY_BYTES
+                           + len(explored) * (EXPLORED_ENTRY_BYTES + key_bytes))
+        if estimated_bytes > memory_budget:
+            print(f"⚠️  Memory budget of {memory_budget} bytes exceeded. Stopping search.")
             break
 
-        _, g_cost, current_marbles, path = heapq.heappop(frontier)
+        _, neg_g_cost, node_id = heapq.heappop(frontier)
+        g_cost = -neg_g_cost
+        current_marbles = node_states[node_id]
         nodes_expanded += 1
 
-        if current_marbles in explored:
+        current_key = state_key(current_marbles)
+        if current_key in explored:
             continue
         
-        explored.add(current_marbles)
+        explored.add(current_key)
         
-        if len(current_marbles) == 1 and BOARD_CENTER in current_marbles:
+        if is_goal(current_marbles):
 
             print(f" Solution Found for {algorithm}!")
+            print(f"  - Path Length: {g_cost} moves")
+            print(f"  - Nodes Expanded: {nodes_expanded}")
+            solution = rebuild_path(node_states, node_parents, node_id)
+            break
 
+        if incremental:
+            parent_sum = node_weight_sums[node_id]
+            num_marbles = count_marbles(current_marbles) - 1
+            for next_state, delta in generate_successors(current_marbles, hole_weights, prune_dead):
+                if state_key(next_state) not in explored:
+                    new_g_cost = g_cost + 1
+                    h_value = heuristic_func.from_weight_sum(parent_sum + delta, num_marbles)
+                    new_priority = combine_priority(algorithm, new_g_cost, h_value)
+                    node_states.append(next_state)
+                    node_parents.append(node_id)
+                    node_weight_sums.append(parent_sum + delta)
+                    heapq.heappush(frontier, (new_priority, -new_g_cost, len(node_states) - 1))
+            peak_frontier = max(peak_frontier, len(frontier))
+            continue
 
+        for next_state in generate_moves(current_marbles, prune_dead):
+            if state_key(next_state) not in explored:
+                new_g_cost = g_cost + 1
+                new_priority = search_priority(algorithm, heuristic_func, new_g_cost, next_state)
+                node_states.append(next_state)
+                node_parents.append(node_id)
+                heapq.heappush(frontier, (new_priority, -new_g_cost, len(node_states) - 1))
+        peak_frontier = max(peak_frontier, len(frontier))
+
+    if solution is None:
+        print(f" No solution found for {algorithm} (or limit was reached).")
+    print(f"  - Peak Frontier Size: {peak_frontier}")
+    print(f"  - Explored Set Size: {len(explored)}")
+
+    stats = {
+        'nodes_expanded': nodes_expanded,
+        'nodes_generated': len(node_states),
+        'peak_frontier': peak_frontier,
+        'explored_size': len(explored),
+        'estimated_bytes': estimated_bytes,
+    }
+    return solution, stats
+
+
+
+# Hash-distributed A* (HDA*): every state is owned by one worker picked by
+# a hash of its (canonical) key. Each worker keeps its own open and closed
+# lists, and successors it does not own are sent to the owner in batches.
+# Termination uses probe waves: the search is over when two waves in a row
+# see every worker idle with identical totals and sent == received batches.
+
+def hda_owner(key, num_workers):
+
+    return (((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % num_workers
+
+def hda_worker(worker_id, num_workers, board_layout, goal_pos, heuristic_func, algorithm, use_symmetry,
+               prune_dead, batch_size, memory_budget, inboxes, result_queue, incumbent):
+
+    # Once its lists outgrow memory_budget the worker stops expanding, drops
+    # incoming states and reports the budget as exhausted to the probe waves.
+    use_board(board_layout, goal_pos)
+    state_key = canonical_key if use_symmetry else (lambda marbles: marbles)
+    state_bytes = sys.getsizeof(GOAL_BIT)
+    key_bytes = sys.getsizeof(state_key(GOAL_BIT))
+    exhausted = False
+    bounded = algorithm in ('A*', 'UCS')
+    inbox = inboxes[worker_id]
+    open_list = []
+    closed = {}
+    outboxes = [[] for _ in range(num_workers)]
+    counter = itertools.count()
+    sent = received = nodes_expanded = peak_open = 0
+
+    def add_open(state, g_cost, parent):
+
+        g_old = closed.get(state_key(state), (None,))[0]
+        if g_old is not None and g_old <= g_cost:
+            return
+        priority = search_priority(algorithm, heuristic_func, g_cost, state)
+        if bounded and priority >= incumbent.value:
+            return
+        heapq.heappush(open_list, (priority, -g_cost, next(counter), state, parent))
+
+    def flush():
+
+        nonlocal sent
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                inboxes[owner].put(('states', batch))
+                outboxes[owner] = []
+                sent += 1
+
+    while True:
+        if not exhausted:
+            estimated_bytes = (len(open_list) * (HEAP_ENTRY_BYTES + 2 * state_bytes)
+                               + len(closed) * (EXPLORED_ENTRY_BYTES + key_bytes + NODE_ENTRY_BYTES + 2 * state_bytes))
+            if estimated_bytes > memory_budget:
+                exhausted = True
+                open_list = []
+        idle = exhausted or not open_list or (bounded and open_list[0][0] >= incumbent.value)
+        if idle:
+            flush()
+        try:
+            message = inbox.get(timeout=0.05) if idle else inbox.get_nowait()
+        except queue.Empty:
+            message = None
+
+        if message is not None:
+            kind = message[0]
+            if kind == 'states':
+                received += 1
+                if not exhausted:
+                    for state, g_cost, parent in message[1]:
+                        add_open(state, g_cost, parent)
+            elif kind == 'probe':
+                result_queue.put(('probe', worker_id, message[1], idle, sent, received, exhausted))
+            elif kind == 'trace':
+                # Closed entries may hold a symmetric variant of the state
+                # asked for; map the stored parent back through the same
+                # symmetry so the path stays in the caller's orientation.
+                state = message[1]
+                _, stored_state, stored_parent = closed[state_key(state)]
+                parent = None
+                if stored_parent is not None:
+                    for row_tables in SYMMETRY_TABLES:
+                        if transform_bitboard(stored_state, row_tables) == state:
+                            parent = transform_bitboard(stored_parent, row_tables)
+                            break
+                result_queue.put(('parent', parent))
+            elif kind == 'stop':
+                result_queue.put(('stats', worker_id, {
+                    'nodes_expanded': nodes_expanded,
+                    'explored_size': len(closed),
+                    'peak_open': peak_open,
+                    'batches_sent': sent,
+                    'batches_received': received,
+                    'exhausted': exhausted,
+                }))
+                # Batches still buffered for workers that have stopped would
+                # block this process's exit on the queue feeder threads.
+                for other in inboxes:
+                    other.cancel_join_thread()
+                return
+            continue
 
+        if idle:
+            continue
 
+        _, neg_g_cost, _, state, parent = heapq.heappop(open_list)
+        g_cost = -neg_g_cost
+        key = state_key(state)
+        if key in closed and closed[key][0] <= g_cost:
+            continue
+        closed[key] = (g_cost, state, parent)
+        nodes_expanded += 1
 
-            print(f"  - Path Length: {g_cost} moves")
-            print(f"  - Nodes Expanded: {nodes_expanded}")
-            return path + [current_marbles]
+        if is_goal(state):
+            with incumbent.get_lock():
+                if g_cost < incumbent.value:
+                    incumbent.value = g_cost
+            result_queue.put(('goal', g_cost, state))
+            continue
 
-        for next_state in generate_moves(current_marbles):
-            if next_state not in explored:
-                new_g_cost = g_cost + 1
-                new_priority = 0
-                if algorithm == 'GBFS':
-                    new_priority = heuristic_func(next_state)
-                elif algorithm == 'A*':
-                    new_priority = new_g_cost + heuristic_func(next_state)
-                elif algorithm == 'UCS':
-                    new_priority = new_g_cost
-                heapq.heappush(frontier, (new_priority, new_g_cost, next_state, path + [current_marbles]))
-                
-    print(f" No solution found for {algorithm} (or limit was reached).")
-    return None
+        for next_state in generate_moves(state, prune_dead):
+            owner = hda_owner(state_key(next_state), num_workers)
+            if owner == worker_id:
+                add_open(next_state, g_cost + 1, state)
+            else:
+                outboxes[owner].append((next_state, g_cost + 1, state))
+                if len(outboxes[owner]) >= batch_size:
+                    inboxes[owner].put(('states', outboxes[owner]))
+                    outboxes[owner] = []
+                    sent += 1
+        peak_open = max(peak_open, len(open_list))
+
+def solve_solitaire_parallel(initial_marbles, heuristic_func, algorithm, num_workers=None,
+                             memory_budget=DEFAULT_MEMORY_BUDGET, use_symmetry=True, prune_dead=True, batch_size=64):
+
+    # Workers run on bitboards; a frozenset start gets a frozenset path back.
+    # GBFS stops at the first goal, A*/UCS keep going until no worker holds a
+    # node that could beat the best goal found so far. Each worker gets an
+    # equal share of memory_budget, and the search stops once one runs out.
+    num_workers = num_workers or multiprocessing.cpu_count()
+    start_time = time.time()
+    initial_bits = initial_marbles if isinstance(initial_marbles, int) else to_bitboard(initial_marbles)
+    state_key = canonical_key if use_symmetry else (lambda marbles: marbles)
+
+    stats = {'num_workers': num_workers, 'nodes_expanded': 0, 'explored_size': 0, 'exhausted': False, 'workers': []}
+    if prune_dead and is_dead_state(initial_bits):
+        print(f" No solution found for parallel {algorithm} (start state is dead).")
+        stats['elapsed'] = time.time() - start_time
+        return None, stats
+
+    inboxes = [multiprocessing.Queue() for _ in range(num_workers)]
+    result_queue = multiprocessing.Queue()
+    incumbent = multiprocessing.Value('d', float('inf'))
+    workers = [
+        multiprocessing.Process(target=hda_worker, args=(
+            worker_id, num_workers, BOARD_LAYOUT, GOAL_POS, heuristic_func, algorithm, use_symmetry,
+            prune_dead, batch_size, memory_budget / num_workers, inboxes, result_queue, incumbent))
+        for worker_id in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # The coordinator sends the root batch, so it counts as one sent batch.
+    inboxes[hda_owner(state_key(initial_bits), num_workers)].put(('states', [(initial_bits, 0, None)]))
+    best_goal = None
+    wave = 0
+    last_totals = None
+    while True:
+        wave += 1
+        for inbox in inboxes:
+            inbox.put(('probe', wave))
+        acks, all_idle, exhausted, total_sent, total_received = 0, True, False, 1, 0
+        while acks < num_workers:
+            message = result_queue.get()
+            if message[0] == 'goal':
+                if best_goal is None or message[1] < best_goal[0]:
+                    best_goal = (message[1], message[2])
+            elif message[0] == 'probe' and message[2] == wave:
+                acks += 1
+                all_idle = all_idle and message[3]
+                total_sent += message[4]
+                total_received += message[5]
+                exhausted = exhausted or message[6]
+        if algorithm == 'GBFS' and best_goal is not None:
+            break
+        if exhausted:
+            stats['exhausted'] = True
+            print(f"⚠️  Memory budget of {memory_budget} bytes exceeded. Stopping search.")
+            break
+        totals = (total_sent, total_received)
+        if all_idle and total_sent == total_received and totals == last_totals:
+            break
+        last_totals = totals if all_idle else None
+        time.sleep(0.01)
+
+    solution = None
+    if best_goal is not None:
+        state = best_goal[1]
+        solution = [state]
+        while True:
+            inboxes[hda_owner(state_key(state), num_workers)].put(('trace', state))
+            message = result_queue.get()
+            while message[0] != 'parent':
+                message = result_queue.get()
+            if message[1] is None:
+                break
+            state = message[1]
+            solution.append(state)
+        solution.reverse()
+        if not isinstance(initial_marbles, int):
+            solution = [from_bitboard(state) for state in solution]
+
+    for inbox in inboxes:
+        inbox.put(('stop',))
+    stopped = 0
+    while stopped < num_workers:
+        message = result_queue.get()
+        if message[0] == 'stats':
+            stopped += 1
+            stats['workers'].append(message[2])
+    for worker in workers:
+        worker.join()
+
+    stats['workers'].sort(key=lambda worker_stats: -worker_stats['nodes_expanded'])
+    stats['nodes_expanded'] = sum(worker_stats['nodes_expanded'] for worker_stats in stats['workers'])
+    stats['explored_size'] = sum(worker_stats['explored_size'] for worker_stats in stats['workers'])
+    stats['elapsed'] = time.time() - start_time
+
+    if solution is None:
+        print(f" No solution found for parallel {algorithm} ({num_workers} workers).")
+    else:
+        print(f" Solution Found for parallel {algorithm} ({num_workers} workers)!")
+        print(f"  - Path Length: {len(solution) - 1} moves")
+    print(f"  - Nodes Expanded: {stats['nodes_expanded']}")
+    print(f"  - Explored Set Size: {stats['explored_size']}")
+    return solution, stats
+
+def compare_parallel_speedup(initial_marbles, heuristic_func, algorithm, num_workers=None, batch_size=64, **kwargs):
+
+    # kwargs (memory_budget, use_symmetry, prune_dead) go to both solvers.
+    start_time = time.time()
+    serial_solution, serial_stats = solve_solitaire(initial_marbles, heuristic_func, algorithm, **kwargs)
+    serial_time = time.time() - start_time
+    parallel_solution, parallel_stats = solve_solitaire_parallel(initial_marbles, heuristic_func, algorithm,
+                                                                 num_workers, batch_size=batch_size, **kwargs)
+    parallel_time = parallel_stats['elapsed']
+    speedup = serial_time / parallel_time if parallel_time > 0 else float('inf')
+    print(f"  - Serial: {serial_time:.4f}s | Parallel ({parallel_stats['num_workers']} workers): "
+          f"{parallel_time:.4f}s | Speedup: {speedup:.2f}x")
+    return {
+        'serial_time': serial_time,
+        'parallel_time': parallel_time,
+        'speedup': speedup,
+        'serial_solved': serial_solution is not None,
+        'parallel_solved': parallel_solution is not None,
+        'serial_stats': serial_stats,
+        'parallel_stats': parallel_stats,
+    }
 
 
 
@@ -149,6 +844,22 @@ if __name__ == '__main__':
     solve_solitaire(start_marbles_full, h2_avg_distance_from_center, 'GBFS')
     print(f"Time taken: {time.time() - start_time:.4f} seconds")
 
+    start_bits_full = get_bitboard(INITIAL_BOARD_STATE)
+    print("\n Running GBFS with h2 on FULL board (bitboard mode)...")
+    start_time = time.time()
+    solve_solitaire(start_bits_full, h2_avg_distance_from_center, 'GBFS')
+    print(f"Time taken: {time.time() - start_time:.4f} seconds")
+
+    # h1 is already exact on solvable states; the speed-up here comes from
+    # prune_dead and from breaking priority ties toward the deeper node.
+    print("\n Running A* Search with h1 and dead-state pruning on FULL board (bitboard mode)...")
+    start_time = time.time()
+    solve_solitaire(start_bits_full, h1_marble_count, 'A*')
+    print(f"Time taken: {time.time() - start_time:.4f} seconds")
+
+    print("\n Comparing single-process and parallel (HDA*) A* with h1 on FULL board...")
+    compare_parallel_speedup(start_bits_full, h1_marble_count, 'A*')
+
     start_marbles_simple = get_marbles(FINAL_SIMPLE_BOARD)
     print("\n Running A* Search with h1 on a FINAL SIMPLE board...")
     start_time = time.time()
@@ -2,6 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import random
 import math
+import time
 
 rajasthan_coords = np.array([
     [26.91, 75.78], [24.58, 73.68], [25.31, 74.64], [27.17, 78.00],
@@ -11,12 +12,43 @@ rajasthan_coords = np.array([
     [26.14, 75.82], [25.34, 74.64], [25.04, 74.52], [24.58, 73.68]
 ])
 
-def calculate_total_distance(tour, distance_matrix):
-    total_dist = 0
-    num_cities = len(tour)
-    for i in range(num_cities):
-        total_dist += distance_matrix[tour[i], tour[(i + 1) % num_cities]]
-    return total_dist
+# Mean Earth radius, so haversine distances come out in kilometres.
+EARTH_RADIUS_KM = 6371.0088
+DISTANCE_METRICS = ('euclidean', 'haversine')
+
+def haversine_distances(lat1, lon1, lat2, lon2):
+    # Great-circle distance between (lat, lon) points in degrees; broadcasts.
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def pair_distances(metric, a, b):
+    # Distances between matching rows of two (n, 2) coordinate arrays, or
+    # between every row of a and every row of b when a is (n, 1, 2).
+    if metric == 'haversine':
+        return haversine_distances(a[..., 0], a[..., 1], b[..., 0], b[..., 1])
+    if metric == 'euclidean':
+        return np.sqrt(((a - b) ** 2).sum(axis=-1))
+    raise ValueError(f"Unknown distance metric: {metric}")
+
+def build_distance_matrix(coords, metric='euclidean', block_size=2048, dtype=np.float64):
+    # Filled a block of rows at a time, so the temporaries stay at
+    # block_size x n even for tens of thousands of points. The matrix itself
+    # is n^2 * itemsize: 3.2 GB at 20,000 points in float64, 1.6 GB in float32.
+    num_cities = len(coords)
+    distance_matrix = np.empty((num_cities, num_cities), dtype=dtype)
+    for start in range(0, num_cities, block_size):
+        stop = min(start + block_size, num_cities)
+        distance_matrix[start:stop] = pair_distances(metric, coords[start:stop, np.newaxis, :], coords[np.newaxis, :, :])
+    return distance_matrix
+
+def calculate_total_distance(tour, distance_matrix=None, coords=None, metric='euclidean'):
+    # Without a matrix the tour's edges are measured straight from coords.
+    tour = np.asarray(tour)
+    following = np.roll(tour, -1)
+    if distance_matrix is None:
+        return float(pair_distances(metric, coords[tour], coords[following]).sum())
+    return float(distance_matrix[tour, following].sum())
 
 def plot_tour(coords, tour, title):
     plt.figure(figsize=(10, 8))
@@ -30,48 +62,249 @@ def plot_tour(coords, tour, title):
     plt.grid(True)
     plt.show()
 
-def simulated_annealing_tsp(coords, initial_temp, cooling_rate, stopping_temp):
+def two_opt_delta(tour, i, j, distance_matrix):
+    num_cities = len(tour)
+    if i == 0 and j == num_cities - 1:
+        return 0.0
+    a, b = tour[i - 1], tour[i]
+    c, d = tour[j], tour[(j + 1) % num_cities]
+    return (distance_matrix[a, c] + distance_matrix[b, d]
+            - distance_matrix[a, b] - distance_matrix[c, d])
+
+def nearest_neighbor_tour(distance_matrix, start=0):
+    num_cities = len(distance_matrix)
+    unvisited = np.ones(num_cities, dtype=bool)
+    unvisited[start] = False
+    tour = [start]
+    for _ in range(num_cities - 1):
+        row = np.where(unvisited, distance_matrix[tour[-1]], np.inf)
+        city = int(np.argmin(row))
+        unvisited[city] = False
+        tour.append(city)
+    return tour
+
+def find_root(parent, city):
+    while parent[city] != city:
+        parent[city] = parent[parent[city]]
+        city = parent[city]
+    return city
+
+def greedy_edge_tour(distance_matrix):
+    # Shortest edges first, skipping any that would give a city degree 3 or close a cycle.
+    num_cities = len(distance_matrix)
+    if num_cities < 3:
+        return list(range(num_cities))
+    rows, cols = np.triu_indices(num_cities, k=1)
+    parent = list(range(num_cities))
+    adjacent = [[] for _ in range(num_cities)]
+    for edge in np.argsort(distance_matrix[rows, cols], kind='stable'):
+        a, b = int(rows[edge]), int(cols[edge])
+        if len(adjacent[a]) < 2 and len(adjacent[b]) < 2:
+            root_a, root_b = find_root(parent, a), find_root(parent, b)
+            if root_a != root_b:
+                parent[root_a] = root_b
+                adjacent[a].append(b)
+                adjacent[b].append(a)
+    start = next(city for city in range(num_cities) if len(adjacent[city]) < 2)
+    tour = [start]
+    previous = None
+    while len(tour) < num_cities:
+        following = [other for other in adjacent[tour[-1]] if other != previous]
+        previous = tour[-1]
+        tour.append(following[0])
+    return tour
+
+def space_filling_curve_tour(coords, bits=16):
+    side = 1 << bits
+    low = coords.min(axis=0)
+    span = np.maximum(coords.max(axis=0) - low, 1e-12)
+    scaled = ((coords - low) / span * (side - 1)).astype(np.int64)
+    x, y = scaled[:, 0], scaled[:, 1]
+    d = np.zeros(len(coords), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = ((x & s) > 0).astype(np.int64)
+        ry = ((y & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry == 0, y, x), np.where(ry == 0, x, y)
+        s >>= 1
+    return np.argsort(d, kind='stable').tolist()
+
+def mst_tour(distance_matrix):
+    # Prim's spanning tree walked in depth-first preorder.
+    num_cities = len(distance_matrix)
+    in_tree = np.zeros(num_cities, dtype=bool)
+    best_link = np.full(num_cities, np.inf)
+    link_from = np.zeros(num_cities, dtype=int)
+    children = [[] for _ in range(num_cities)]
+    best_link[0] = 0
+    for _ in range(num_cities):
+        city = int(np.argmin(np.where(in_tree, np.inf, best_link)))
+        in_tree[city] = True
+        if city != 0:
+            children[link_from[city]].append(city)
+        closer = ~in_tree & (distance_matrix[city] < best_link)
+        best_link[closer] = distance_matrix[city][closer]
+        link_from[closer] = city
+    tour = []
+    stack = [0]
+    while stack:
+        city = stack.pop()
+        tour.append(city)
+        stack.extend(reversed(children[city]))
+    return tour
+
+# All but 'random' and 'space_filling_curve' are O(n^2) on the dense matrix.
+INITIAL_TOUR_METHODS = ('random', 'nearest_neighbor', 'greedy', 'space_filling_curve', 'mst')
+
+def build_initial_tour(coords, distance_matrix, method='random'):
+    if method == 'random':
+        tour = list(range(len(coords)))
+        random.shuffle(tour)
+        return tour
+    if method == 'nearest_neighbor':
+        return nearest_neighbor_tour(distance_matrix, start=random.randrange(len(coords)))
+    if method == 'greedy':
+        return greedy_edge_tour(distance_matrix)
+    if method == 'space_filling_curve':
+        return space_filling_curve_tour(coords)
+    if method == 'mst':
+        return mst_tour(distance_matrix)
+    raise ValueError(f"Unknown initial tour method: {method}")
+
+def initial_temperature(tour, distance_matrix, acceptance=0.1):
+    edges = distance_matrix[tour, np.roll(tour, -1)]
+    return max(float(edges.mean() + edges.std()), 1e-9) / -math.log(acceptance)
+
+def simulated_annealing_tsp(coords, initial_temp, cooling_rate, stopping_temp, initial_tour='random',
+                            metric='euclidean', dtype=np.float64):
+    # initial_tour is one of INITIAL_TOUR_METHODS or an explicit tour;
+    # initial_temp=None derives the starting temperature from that tour.
+    # dtype=np.float32 halves the dense distance matrix for large instances.
     num_cities = len(coords)
-    distance_matrix = np.sqrt(((coords[:, np.newaxis, :] - coords[np.newaxis, :, :]) ** 2).sum(axis=2))
-    current_solution = list(range(num_cities))
-    random.shuffle(current_solution)
+    distance_matrix = build_distance_matrix(coords, metric, dtype=dtype)
+    if isinstance(initial_tour, str):
+        current_solution = build_initial_tour(coords, distance_matrix, initial_tour)
+    else:
+        current_solution = list(initial_tour)
     current_cost = calculate_total_distance(current_solution, distance_matrix)
     best_solution = list(current_solution)
     best_cost = current_cost
+    if initial_temp is None:
+        initial_temp = initial_temperature(current_solution, distance_matrix)
     temperature = initial_temp
 
     while temperature > stopping_temp:
         i, j = sorted(random.sample(range(num_cities), 2))
-        neighbor_solution = current_solution[:i] + current_solution[i:j+1][::-1] + current_solution[j+1:]
-        neighbor_cost = calculate_total_distance(neighbor_solution, distance_matrix)
-        cost_delta = neighbor_cost - current_cost
+        cost_delta = float(two_opt_delta(current_solution, i, j, distance_matrix))
         
         if cost_delta < 0 or (temperature > 1e-9 and random.random() < math.exp(-cost_delta / temperature)):
-            current_solution = neighbor_solution
-            current_cost = neighbor_cost
+            current_solution[i:j+1] = current_solution[i:j+1][::-1]
+            current_cost += cost_delta
         
         if current_cost < best_cost:
             best_solution = list(current_solution)
-            best_cost = best_cost
+            best_cost = current_cost
             
         temperature *= cooling_rate
         
     return best_solution, best_cost
 
+def deduplicate_points(coords):
+    # Coincident cities (e.g. 1 and 19 in rajasthan_coords) are solved once;
+    # groups[r] lists every original index sharing unique point r.
+    unique_coords, first_index, inverse = np.unique(coords, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first_index)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    groups = [[] for _ in range(len(order))]
+    for city, point in enumerate(rank[inverse.ravel()]):
+        groups[point].append(city)
+    return unique_coords[order], groups
+
+def expand_tour(tour, groups):
+    # Visit each unique point's twins back to back; the extra edges are zero.
+    return [city for point in tour for city in groups[point]]
+
+def held_karp(distance_matrix):
+    # dp[mask, k]: shortest path from city 0 through mask (bit k = city k + 1)
+    # ending at city k + 1, filled one layer of equal-size masks at a time.
+    num_cities = len(distance_matrix)
+    if num_cities <= 3:
+        tour = list(range(num_cities))
+        return tour, calculate_total_distance(tour, distance_matrix)
+    m = num_cities - 1
+    inner = np.asarray(distance_matrix[1:, 1:], dtype=np.float32)
+    masks = np.arange(1 << m, dtype=np.int64)
+    sizes = np.zeros(1 << m, dtype=np.int8)
+    for k in range(m):
+        sizes += ((masks >> k) & 1).astype(np.int8)
+    dp = np.full((1 << m, m), np.inf, dtype=np.float32)
+    parent = np.full((1 << m, m), -1, dtype=np.int8)
+    dp[1 << np.arange(m), np.arange(m)] = distance_matrix[0, 1:]
+
+    for size in range(2, m + 1):
+        layer = masks[sizes == size]
+        for k in range(m):
+            sel = layer[(layer >> k) & 1 == 1]
+            candidates = dp[sel ^ (1 << k)] + inner[:, k]
+            best = np.argmin(candidates, axis=1)
+            dp[sel, k] = candidates[np.arange(len(sel)), best]
+            parent[sel, k] = best
+
+    full = (1 << m) - 1
+    k = int(np.argmin(dp[full] + np.asarray(distance_matrix[1:, 0], dtype=np.float32)))
+    mask = full
+    path = []
+    while k >= 0:
+        path.append(k + 1)
+        previous = int(parent[mask, k])
+        mask ^= 1 << k
+        k = previous
+    tour = [0] + path[::-1]
+    return tour, calculate_total_distance(tour, distance_matrix)
+
+# Largest number of distinct cities solved exactly (about 220 MB of DP table at 22).
+HELD_KARP_LIMIT = 22
+
+def solve_tsp(coords, initial_temp, cooling_rate, stopping_temp, exact_limit=HELD_KARP_LIMIT,
+              metric='euclidean', dtype=np.float64):
+    # Held-Karp when the distinct cities fit, simulated annealing otherwise.
+    # Returns (tour, cost, exact).
+    unique_coords, groups = deduplicate_points(coords)
+    if len(unique_coords) <= exact_limit:
+        distance_matrix = build_distance_matrix(unique_coords, metric)
+        tour, cost = held_karp(distance_matrix)
+        exact = True
+    else:
+        tour, cost = simulated_annealing_tsp(unique_coords, initial_temp, cooling_rate, stopping_temp,
+                                             metric=metric, dtype=dtype)
+        exact = False
+    return expand_tour(tour, groups), cost, exact
+
 if __name__ == '__main__':
     print("the Rajasthan TSP ")
     
     INITIAL_TEMP = 1000
     COOLING_RATE = 0.9995
     STOPPING_TEMP = 1e-4
+    # rajasthan_coords are (latitude, longitude) degrees.
+    METRIC = 'haversine'
 
-    print(f"Running Simulated Annealing for {len(rajasthan_coords)} cities...")
+    unique_count = len(deduplicate_points(rajasthan_coords)[0])
+    method = "Held-Karp" if unique_count <= HELD_KARP_LIMIT else "Simulated Annealing"
+    print(f"Running {method} for {len(rajasthan_coords)} cities ({unique_count} distinct)...")
     
-    final_solution, final_cost = simulated_annealing_tsp(
-        rajasthan_coords, INITIAL_TEMP, COOLING_RATE, STOPPING_TEMP
+    start_time = time.time()
+    final_solution, final_cost, exact = solve_tsp(
+        rajasthan_coords, INITIAL_TEMP, COOLING_RATE, STOPPING_TEMP, metric=METRIC
     )
     
-    print(f"Found tour with cost: {final_cost:.2f}")
+    print(f"Found tour with cost: {final_cost:.2f} km" + (" (certified optimal)" if exact else ""))
+    print(f"Time taken: {time.time() - start_time:.2f}s")
     print(f" Best route (city order): {' -> '.join(map(str, final_solution))}")
     
     plot_tour(rajasthan_coords, final_solution, "TSP Solution for Rajasthan")
\ No newline at end of file
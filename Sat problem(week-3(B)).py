@@ -1,6 +1,14 @@
 import random
 import itertools
+from array import array
 import time
+import contextlib
+import gzip
+import heapq
+import io
+import multiprocessing
+import queue
+import numpy as np
 import matplotlib.pyplot as plt
 
 def generate_k_sat(n, m, k):
@@ -18,6 +26,99 @@ def generate_k_sat(n, m, k):
         
     return formula
 
+class FlatFormula:
+
+    # Compact clause store: every literal in one array('i'), clause c being
+    # literals[offsets[c]:offsets[c + 1]]. It iterates and indexes like a list
+    # of clauses, so every solver here accepts it in place of a list.
+
+    def __init__(self, num_vars=0):
+        self.num_vars = num_vars
+        self.literals = array('i')
+        self.offsets = array('q', [0])
+
+    @classmethod
+    def from_clauses(cls, formula, num_vars=0):
+        store = cls(num_vars)
+        for clause in formula:
+            store.add_clause(clause)
+        return store
+
+    def add_clause(self, clause):
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+        for literal in clause:
+            if abs(literal) > self.num_vars:
+                self.num_vars = abs(literal)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, c):
+        return self.literals[self.offsets[c]:self.offsets[c + 1]]
+
+    def __iter__(self):
+        literals, offsets = self.literals, self.offsets
+        for c in range(len(offsets) - 1):
+            yield literals[offsets[c]:offsets[c + 1]]
+
+def open_cnf(filename, mode):
+
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode + 't')
+    return open(filename, mode)
+
+def read_dimacs(filename):
+
+    # Streams the file line by line straight into a FlatFormula; no
+    # per-clause lists are built. Clauses may span lines, and a '%' line (as
+    # in SATLIB files) ends the clause section. Files ending in .gz are read
+    # through gzip.
+    store = FlatFormula()
+    literals, offsets = store.literals, store.offsets
+    declared_vars = declared_clauses = None
+    max_var = 0
+    with open_cnf(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == 'c':
+                continue
+            if line[0] == 'p':
+                parts = line.split()
+                if len(parts) != 4 or parts[1] != 'cnf':
+                    raise ValueError(f"Invalid DIMACS problem line: {line}")
+                declared_vars, declared_clauses = int(parts[2]), int(parts[3])
+                continue
+            if line[0] == '%':
+                break
+            for token in line.split():
+                literal = int(token)
+                if literal == 0:
+                    offsets.append(len(literals))
+                else:
+                    literals.append(literal)
+                    if abs(literal) > max_var:
+                        max_var = abs(literal)
+    if len(literals) != offsets[-1]:
+        offsets.append(len(literals))
+    if declared_vars is None:
+        raise ValueError(f"No 'p cnf' header found in {filename}.")
+    if declared_clauses != len(store):
+        print(f"Warning: {filename} declares {declared_clauses} clauses but contains {len(store)}.")
+    store.num_vars = max(declared_vars, max_var)
+    return store
+
+def write_dimacs(formula, filename, num_vars=None):
+
+    # Accepts a list of clauses or a FlatFormula and writes one clause per line.
+    if num_vars is None:
+        num_vars = getattr(formula, 'num_vars', 0) or max((abs(literal) for clause in formula for literal in clause), default=0)
+    with open_cnf(filename, 'w') as f:
+        f.write(f"p cnf {num_vars} {len(formula)}\n")
+        for clause in formula:
+            f.write(" ".join(map(str, clause)))
+            f.write(" 0\n" if len(clause) else "0\n")
+
 def h1_satisfied_clauses(formula, assignment):
   
     satisfied_count = 0
@@ -29,105 +130,853 @@ def h1_satisfied_clauses(formula, assignment):
                 break
     return satisfied_count
 
+class IncrementalScorer:
+
+    # Per-clause true-literal counts plus per-variable occurrence lists, with
+    # cached make/break counts. Flipping a variable only touches the clauses
+    # it occurs in, and the gain of any flip (make - break) is read in O(1).
+    # crit[c] is the XOR of the variables of the true literals of clause c,
+    # so it names the single true variable when true_count[c] == 1.
+    # Clause variables and occurrence lists are flat arrays with start
+    # offsets (as in FlatFormula), so large formulas stay compact.
+
+    def __init__(self, formula, n, assignment):
+        self.n = n
+        self.num_clauses = len(formula)
+        self.assignment = list(assignment)
+        self.var_flat = array('i')
+        self.sign_flat = array('b')
+        self.clause_start = array('q', [0])
+        self.num_always_true = 0
+        self.num_empty = 0
+        for clause in formula:
+            literals = set(clause)
+            if any(-literal in literals for literal in literals):
+                self.num_always_true += 1
+                continue
+            if not literals:
+                self.num_empty += 1
+                continue
+            for literal in literals:
+                self.var_flat.append(abs(literal) - 1)
+                self.sign_flat.append(literal > 0)
+            self.clause_start.append(len(self.var_flat))
+        num_scored = len(self.clause_start) - 1
+
+        # Occurrences of literal (var, positive) are at slot 2 * var, and of
+        # (var, negative) at slot 2 * var + 1.
+        occ_count = [0] * (2 * n + 1)
+        for var, sign in zip(self.var_flat, self.sign_flat):
+            occ_count[2 * var + 1 - sign] += 1
+        self.occ_start = array('q', [0]) * (2 * n + 1)
+        total = 0
+        for slot in range(2 * n):
+            self.occ_start[slot] = total
+            total += occ_count[slot]
+        self.occ_start[2 * n] = total
+        cursor = list(self.occ_start)
+        self.occ = array('i', bytes(4 * total))
+        for c in range(num_scored):
+            for index in range(self.clause_start[c], self.clause_start[c + 1]):
+                slot = 2 * self.var_flat[index] + 1 - self.sign_flat[index]
+                self.occ[cursor[slot]] = c
+                cursor[slot] += 1
+
+        self.true_count = array('i', bytes(4 * num_scored))
+        self.crit = array('i', bytes(4 * num_scored))
+        self.make = [0] * n
+        self.brk = [0] * n
+        self.unsat = []
+        self.unsat_pos = array('i', [-1]) * num_scored
+        for var in range(n):
+            for c in self.occurrences(var, self.assignment[var]):
+                self.true_count[c] += 1
+                self.crit[c] ^= var
+        for c in range(num_scored):
+            if self.true_count[c] == 0:
+                self._add_unsat(c)
+                for var in self.clause_variables(c):
+                    self.make[var] += 1
+            elif self.true_count[c] == 1:
+                self.brk[self.crit[c]] += 1
+        # Variables with a positive gain, bucketed by gain, so the best flip
+        # is found without scanning all n variables.
+        self.level = [0] * n
+        self.buckets = {}
+        for var in range(n):
+            self._rebucket(var)
+
+    def occurrences(self, var, positive):
+        slot = 2 * var + (0 if positive else 1)
+        return self.occ[self.occ_start[slot]:self.occ_start[slot + 1]]
+
+    def clause_variables(self, c):
+        return self.var_flat[self.clause_start[c]:self.clause_start[c + 1]]
+
+    @property
+    def num_satisfied(self):
+        return self.num_clauses - len(self.unsat) - self.num_empty
+
+    def is_solved(self):
+        return not self.unsat and not self.num_empty
+
+    def gain(self, var):
+        return self.make[var] - self.brk[var]
+
+    def best_improving_var(self):
+        if not self.buckets:
+            return None
+        return next(iter(self.buckets[max(self.buckets)]))
+
+    def _rebucket(self, var):
+        gain = self.make[var] - self.brk[var]
+        old = self.level[var]
+        if gain == old:
+            return
+        if old > 0:
+            bucket = self.buckets[old]
+            bucket.discard(var)
+            if not bucket:
+                del self.buckets[old]
+        if gain > 0:
+            self.buckets.setdefault(gain, set()).add(var)
+        self.level[var] = gain
+
+    def is_true_in(self, c, var):
+        for index in range(self.clause_start[c], self.clause_start[c + 1]):
+            if self.var_flat[index] == var:
+                return self.sign_flat[index] == self.assignment[var]
+        return False
+
+    def pair_gain(self, i, j, shared_clauses):
+        # Gain of flipping i and j together: the two single gains, corrected
+        # on the clauses both occur in, where the single gains do not add up.
+        gain = self.make[i] - self.brk[i] + self.make[j] - self.brk[j]
+        for c in shared_clauses:
+            count = self.true_count[c]
+            was_sat = count > 0
+            step_i = -1 if self.is_true_in(c, i) else 1
+            step_j = -1 if self.is_true_in(c, j) else 1
+            gain += ((count + step_i + step_j > 0) - was_sat
+                     - ((count + step_i > 0) - was_sat)
+                     - ((count + step_j > 0) - was_sat))
+        return gain
+
+    def _add_unsat(self, c):
+        self.unsat_pos[c] = len(self.unsat)
+        self.unsat.append(c)
+
+    def _remove_unsat(self, c):
+        pos = self.unsat_pos[c]
+        last = self.unsat.pop()
+        if last != c:
+            self.unsat[pos] = last
+            self.unsat_pos[last] = pos
+        self.unsat_pos[c] = -1
+
+    def flip(self, var):
+        value = self.assignment[var]
+        self.assignment[var] = not value
+        true_count, crit, make, brk = self.true_count, self.crit, self.make, self.brk
+        touched = [var]
+
+        for c in self.occurrences(var, not value):
+            count = true_count[c]
+            if count == 0:
+                self._remove_unsat(c)
+                variables = self.clause_variables(c)
+                for other in variables:
+                    make[other] -= 1
+                touched.extend(variables)
+                brk[var] += 1
+            elif count == 1:
+                brk[crit[c]] -= 1
+                touched.append(crit[c])
+            true_count[c] = count + 1
+            crit[c] ^= var
+
+        for c in self.occurrences(var, value):
+            count = true_count[c]
+            if count == 1:
+                self._add_unsat(c)
+                variables = self.clause_variables(c)
+                for other in variables:
+                    make[other] += 1
+                touched.extend(variables)
+                brk[var] -= 1
+            elif count == 2:
+                brk[crit[c] ^ var] += 1
+                touched.append(crit[c] ^ var)
+            true_count[c] = count - 1
+            crit[c] ^= var
+
+        for other in touched:
+            self._rebucket(other)
+
 def hill_climbing(formula, n, max_restarts=50, max_steps=1000):
     
     for restart in range(1, max_restarts + 1):
-        current_assignment = [random.choice([True, False]) for _ in range(n)]
-        score_history = [h1_satisfied_clauses(formula, current_assignment)]
+        scorer = IncrementalScorer(formula, n, [random.choice([True, False]) for _ in range(n)])
+        score_history = [scorer.num_satisfied]
         
         for step in range(1, max_steps):
-            current_score = score_history[-1]
-            if current_score == len(formula):
+            if scorer.num_satisfied == len(formula):
                 print(f"Hill-Climbing: Solution found on restart {restart}!")
                 print(f"  - Steps (L): {step}")
-                return current_assignment, score_history
-
-            best_neighbor, best_neighbor_score = None, current_score
-            for i in range(n):
-                neighbor = list(current_assignment)
-                neighbor[i] = not neighbor[i]
-                neighbor_score = h1_satisfied_clauses(formula, neighbor)
-                
-               
-                if neighbor_score > best_neighbor_score:
-                    best_neighbor, best_neighbor_score = neighbor, neighbor_score
-            
-            if best_neighbor is None:
+                return scorer.assignment, score_history
+
+            best_var = scorer.best_improving_var()
+            if best_var is None:
                 break 
             
-            current_assignment = best_neighbor
-            score_history.append(best_neighbor_score)
+            scorer.flip(best_var)
+            score_history.append(scorer.num_satisfied)
             
     print("Hill-Climbing: No solution found after all restarts.")
     return None, []
 
+def compile_formula(formula, n):
+
+    # Literal-index and sign arrays of shape (m, k). Short clauses repeat
+    # their first literal, which leaves the OR unchanged. Empty clauses point
+    # at an extra always-False column n with a positive sign, so they are
+    # never satisfied.
+    k = max((len(clause) for clause in formula), default=1) or 1
+    lit_vars = np.full((len(formula), k), n, dtype=np.int32)
+    lit_signs = np.ones((len(formula), k), dtype=bool)
+    for c, clause in enumerate(formula):
+        if len(clause):
+            padded = list(clause) + [clause[0]] * (k - len(clause))
+            lit_vars[c] = [abs(literal) - 1 for literal in padded]
+            lit_signs[c] = [literal > 0 for literal in padded]
+    return lit_vars, lit_signs
+
+def batch_satisfied_clauses(compiled, assignments, max_cells=1 << 24):
+
+    # Scores a (B, n) boolean batch of assignments at once, in row chunks so
+    # the (rows, m, k) literal-truth tensor stays under max_cells elements.
+    lit_vars, lit_signs = compiled
+    batch_size, n = assignments.shape
+    padded = np.zeros((batch_size, n + 1), dtype=bool)
+    padded[:, :n] = assignments
+    scores = np.empty(batch_size, dtype=np.int64)
+    rows = max(1, max_cells // max(1, lit_vars.size))
+    for start in range(0, batch_size, rows):
+        chunk = padded[start:start + rows]
+        scores[start:start + rows] = (chunk[:, lit_vars] == lit_signs).any(axis=2).sum(axis=1)
+    return scores
+
+def batch_flip_gains(compiled, assignments, max_cells=1 << 24):
+
+    # Change in satisfied clauses from flipping each single variable of each
+    # assignment in a (B, n) boolean batch, as a (B, n) int32 array: +1 per
+    # unsatisfied clause the variable occurs in, -1 per clause where it owns
+    # the only true literal. Repeated literals (padding) count once, and
+    # clauses holding both x and -x are always satisfied and skipped.
+    lit_vars, lit_signs = compiled
+    batch_size, n = assignments.shape
+    num_clauses, k = lit_vars.shape
+    distinct = np.ones((num_clauses, k), dtype=bool)
+    tautology = np.zeros(num_clauses, dtype=bool)
+    for j in range(k):
+        for i in range(j):
+            same_var = lit_vars[:, i] == lit_vars[:, j]
+            distinct[:, j] &= ~(same_var & (lit_signs[:, i] == lit_signs[:, j]))
+            tautology |= same_var & (lit_signs[:, i] != lit_signs[:, j])
+    padded = np.zeros((batch_size, n + 1), dtype=bool)
+    padded[:, :n] = assignments
+    gains = np.empty((batch_size, n), dtype=np.int32)
+    rows = max(1, max_cells // max(1, lit_vars.size))
+    for start in range(0, batch_size, rows):
+        chunk = padded[start:start + rows]
+        true_lits = [(chunk[:, lit_vars[:, j]] == lit_signs[:, j]) & distinct[:, j] for j in range(k)]
+        true_count = sum(true_lit.astype(np.int8) for true_lit in true_lits)
+        true_count[:, tautology] = 2
+        unsatisfied, critical = true_count == 0, true_count == 1
+        offsets = np.arange(len(chunk))[:, np.newaxis] * (n + 1)
+        change = np.zeros(len(chunk) * (n + 1))
+        for j in range(k):
+            weight = (unsatisfied & distinct[:, j]).astype(np.int8) - (critical & true_lits[j])
+            change += np.bincount((offsets + lit_vars[:, j]).ravel(), weights=weight.ravel(), minlength=len(change))
+        gains[start:start + rows] = change.reshape(len(chunk), n + 1)[:, :n]
+    return gains
+
 def beam_search_with_restarts(formula, n, beam_width, max_restarts=20, max_iterations=500):
    
+    # A neighbour is a beam row with one variable flipped, scored as its
+    # parent's score plus the flip's gain, so clauses are evaluated once per
+    # parent rather than once per neighbour. Only the best-scoring
+    # neighbours are built, bit-packed straight from the parent row XOR the
+    # variable's bit, and deduplicated; the pool is widened if duplicates
+    # leave fewer than beam_width distinct rows.
+    compiled = compile_formula(formula, n)
+    num_clauses = len(formula)
+    num_bytes = (n + 7) // 8
+    flip_byte = np.arange(n) // 8
+    flip_bit = (0x80 >> (np.arange(n) % 8)).astype(np.uint8)
+
     for restart in range(1, max_restarts + 1):
-        beam = [[random.choice([True, False]) for _ in range(n)] for _ in range(beam_width)]
+        bits = random.getrandbits(8 * num_bytes * beam_width).to_bytes(num_bytes * beam_width, 'little')
+        beam = np.unpackbits(np.frombuffer(bits, dtype=np.uint8)).reshape(beam_width, -1)[:, :n].astype(bool)
+        packed = np.packbits(beam, axis=1)
+        beam_scores = batch_satisfied_clauses(compiled, beam)
         
         for iteration in range(max_iterations):
-            for assignment in beam:
-                if h1_satisfied_clauses(formula, assignment) == len(formula):
-                    print(f"Beam Search (b={beam_width}): Solution found on restart {restart} in iteration {iteration + 1}!")
-                    return
-
-            all_neighbors = []
-            for assignment in beam:
-                for i in range(n):
-                    neighbor = list(assignment)
-                    neighbor[i] = not neighbor[i]
-                    all_neighbors.append(neighbor)
-            
-            unique_neighbors = [list(x) for x in set(tuple(x) for x in all_neighbors)]
-            neighbor_scores = []
-            for neighbor in unique_neighbors:
-                score = h1_satisfied_clauses(formula, neighbor)
-                neighbor_scores.append((score, neighbor))
-            
-            neighbor_scores.sort(key=lambda x: x[0], reverse=True)
-            
-            if not neighbor_scores or neighbor_scores[0][0] <= h1_satisfied_clauses(formula, beam[0]):
+            if (beam_scores == num_clauses).any():
+                print(f"Beam Search (b={beam_width}): Solution found on restart {restart} in iteration {iteration + 1}!")
+                return [bool(value) for value in beam[np.argmax(beam_scores == num_clauses)]]
+
+            neighbor_scores = batch_flip_gains(compiled, beam)
+            neighbor_scores += beam_scores[:, np.newaxis].astype(np.int32)
+            neighbor_scores = neighbor_scores.ravel()
+            if neighbor_scores.max() <= beam_scores[0]:
                 break 
+
+            take = beam_width
+            while True:
+                take = min(take, len(neighbor_scores))
+                top = np.argpartition(-neighbor_scores, take - 1)[:take]
+                top = top[np.lexsort((top, -neighbor_scores[top]))]
+                parents, variables = np.divmod(top, n)
+                candidates = packed[parents]
+                candidates[np.arange(take), flip_byte[variables]] ^= flip_bit[variables]
+                _, unique_index = np.unique(candidates, axis=0, return_index=True)
+                unique_index = np.sort(unique_index)[:beam_width]
+                if len(unique_index) == beam_width or take == len(neighbor_scores):
+                    break
+                take *= 2
             
-            beam = [item[1] for item in neighbor_scores[:beam_width]]
+            packed, beam_scores = candidates[unique_index], neighbor_scores[top[unique_index]].astype(np.int64)
+            beam = np.unpackbits(packed, axis=1, count=n).astype(bool)
 
     print(f"Beam Search (b={beam_width}): No solution found after all restarts.")
+    return None
+
+def build_pair_clauses(scorer):
+
+    # Maps every pair (i, j), i < j, of variables that share a clause to the
+    # clauses they share. Pairs that share no clause have additive gains.
+    pair_clauses = {}
+    for c in range(len(scorer.clause_start) - 1):
+        variables = sorted(scorer.clause_variables(c))
+        for i, j in itertools.combinations(variables, 2):
+            pair_clauses.setdefault((i, j), []).append(c)
+    return pair_clauses
 
-def variable_neighborhood_descent_with_restarts(formula, n, max_restarts=10, max_steps=500):
+def variable_neighborhood_descent_with_restarts(formula, n, max_restarts=10, max_steps=500, max_k=2):
   
+    # Level k is only reached when no flip of fewer variables improves, so
+    # every single gain is <= 0. A flip set that splits into parts sharing no
+    # clause has a gain equal to the sum of its parts' gains, so it cannot
+    # improve either. Levels 2 and 3 therefore only look at variable sets
+    # that are connected through shared clauses.
     num_clauses = len(formula)
+    pair_clauses = None
     
     for restart in range(1, max_restarts + 1):
-        s = [random.choice([True, False]) for _ in range(n)]
+        scorer = IncrementalScorer(formula, n, [random.choice([True, False]) for _ in range(n)])
+        if pair_clauses is None:
+            pair_clauses = build_pair_clauses(scorer)
+            neighbors = [set() for _ in range(n)]
+            for i, j in pair_clauses:
+                neighbors[i].add(j)
+                neighbors[j].add(i)
+
         for step in range(1, max_steps):
-            current_score = h1_satisfied_clauses(formula, s)
+            current_score = scorer.num_satisfied
             if current_score == num_clauses:
                 print(f"VND: Solution found on restart {restart}!")
                 print(f"  - Steps (L): {step}")
-                return
+                return scorer.assignment
             
-            k = 1
-            moved = False
-            while k <= 2 and not moved:
-                best_neighbor_in_Nk, best_neighbor_score = None, current_score
-                indices_to_flip_combinations = itertools.combinations(range(n), k)
-                
-                for combo in indices_to_flip_combinations:
-                    neighbor = list(s)
-                    for index in combo:
-                        neighbor[index] = not neighbor[index]
-                    score = h1_satisfied_clauses(formula, neighbor)
-                    if score > best_neighbor_score:
-                        best_neighbor_in_Nk, best_neighbor_score = neighbor, score
-                
-                if best_neighbor_in_Nk is not None:
-                    s = best_neighbor_in_Nk
-                    moved = True
-                else:
-                    k += 1
+            # k = 1: the best single flip comes straight from the cached gains.
+            best_var = scorer.best_improving_var()
+            if best_var is not None:
+                scorer.flip(best_var)
+                continue
+
+            # k = 2: single gains plus the shared-clause correction.
+            best_combo, best_gain = None, 0
+            for (i, j), shared in pair_clauses.items():
+                gain = scorer.pair_gain(i, j, shared)
+                if gain > best_gain:
+                    best_combo, best_gain = (i, j), gain
+
+            # k = 3: flip a sharing pair, then read the exact gain of every
+            # variable sharing a clause with either of them.
+            if best_combo is None and max_k >= 3:
+                for (i, j), shared in pair_clauses.items():
+                    gain_ij = scorer.pair_gain(i, j, shared)
+                    scorer.flip(i)
+                    scorer.flip(j)
+                    for l in neighbors[i] | neighbors[j]:
+                        if l != i and l != j and gain_ij + scorer.gain(l) > best_gain:
+                            best_combo, best_gain = (i, j, l), gain_ij + scorer.gain(l)
+                    scorer.flip(j)
+                    scorer.flip(i)
+
+            if best_combo is None:
+                break
+            for index in best_combo:
+                scorer.flip(index)
     
     print("VND: No solution found after all restarts.")
+    return None
+
+def walksat(formula, n, method='probsat', max_flips=1000000, max_restarts=10, noise=0.5, cb=2.38, eps=1.0):
+
+    # Both variants pick a random clause from the scorer's O(1) unsat list
+    # and choose a variable from it using the cached break counts.
+    #   'walksat': flip a zero-break variable if there is one; otherwise a
+    #              random variable with probability noise, else the one with
+    #              the fewest breaks.
+    #   'probsat': pick variable v with probability proportional to
+    #              (eps + break(v)) ** -cb.
+    if method not in ('walksat', 'probsat'):
+        raise ValueError("method must be 'walksat' or 'probsat'.")
+    start_time = time.time()
+    weight_table = [(eps + b) ** -cb for b in range(64)]
+    total_flips = 0
+    restarts_run = 0
+
+    for restart in range(1, max_restarts + 1):
+        scorer = IncrementalScorer(formula, n, [random.choice([True, False]) for _ in range(n)])
+        if scorer.num_empty:
+            print(f"WalkSAT ({method}): The formula has an empty clause and cannot be satisfied.")
+            break
+        brk, unsat, clause_variables = scorer.brk, scorer.unsat, scorer.clause_variables
+        restart_time = time.time()
+
+        for flip in range(max_flips):
+            if not unsat:
+                elapsed = time.time() - start_time
+                total_flips += flip
+                stats = {
+                    'method': method,
+                    'restarts': restart,
+                    'flips': total_flips,
+                    'time': elapsed,
+                    'flips_per_second': total_flips / elapsed if elapsed > 0 else float('inf'),
+                }
+                print(f"WalkSAT ({method}): Solution found on restart {restart}!")
+                print(f"  - Flips: {total_flips} ({stats['flips_per_second']:.0f} flips/s)")
+                return scorer.assignment, stats
+
+            variables = clause_variables(unsat[random.randrange(len(unsat))])
+            if method == 'probsat':
+                weights = [weight_table[brk[var]] if brk[var] < 64 else (eps + brk[var]) ** -cb for var in variables]
+                var = random.choices(variables, weights)[0]
+            else:
+                var = min(variables, key=brk.__getitem__)
+                if brk[var] > 0 and random.random() < noise:
+                    var = random.choice(variables)
+            scorer.flip(var)
+
+        total_flips += max_flips
+        restarts_run = restart
+        print(f"WalkSAT ({method}): restart {restart} ended with {len(unsat)} unsatisfied clauses "
+              f"({max_flips / (time.time() - restart_time):.0f} flips/s).")
+
+    elapsed = time.time() - start_time
+    print(f"WalkSAT ({method}): No solution found after {restarts_run} restarts.")
+    return None, {
+        'method': method,
+        'restarts': restarts_run,
+        'flips': total_flips,
+        'time': elapsed,
+        'flips_per_second': total_flips / elapsed if elapsed > 0 else 0.0,
+    }
+
+def luby(i):
+
+    # i-th term (1-based) of the Luby restart sequence 1, 1, 2, 1, 1, 2, 4, ...
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+class CDCLSolver:
+
+    # Complete conflict-driven clause-learning solver. Literals are encoded
+    # as 2 * var + sign (sign 1 = negated), so lit ^ 1 is the negation.
+    # - Two watched literals: clause[0] and clause[1] are watched, and an
+    #   implied literal always sits in clause[0] of its reason clause.
+    # - First-UIP learning with reason-based minimization.
+    # - VSIDS branching on a lazy max-heap, with phase saving.
+    # - Luby restarts.
+    # - Periodic deletion of the half of the learned clauses with the highest
+    #   LBD (clauses with LBD <= 2 are kept).
+
+    def __init__(self, formula, n, var_decay=0.95, restart_base=100, reduce_interval=2000):
+        self.n = n
+        self.var_decay = var_decay
+        self.restart_base = restart_base
+        self.reduce_interval = reduce_interval
+        self.clauses = []
+        self.learned = []
+        self.lbd = {}
+        self.watches = [[] for _ in range(2 * n)]
+        self.values = [-1] * n
+        self.level = [0] * n
+        self.reason = [-1] * n
+        self.phase = [False] * n
+        self.seen = [False] * n
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.activity = [0.0] * n
+        self.var_inc = 1.0
+        self.heap = [(0.0, var) for var in range(n)]
+        self.ok = True
+        self.stats = {'decisions': 0, 'propagations': 0, 'conflicts': 0, 'restarts': 0,
+                      'learned': 0, 'deleted': 0}
+        self.next_reduce = reduce_interval
+        for clause in formula:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        literals = set(clause)
+        if any(-literal in literals for literal in literals):
+            return
+        lits = [2 * (abs(literal) - 1) + (literal < 0) for literal in literals]
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            value = self.lit_value(lits[0])
+            if value == 0:
+                self.ok = False
+            elif value < 0:
+                self.enqueue(lits[0], -1)
+        else:
+            ci = len(self.clauses)
+            self.clauses.append(lits)
+            self.watches[lits[0]].append(ci)
+            self.watches[lits[1]].append(ci)
+
+    def lit_value(self, lit):
+        value = self.values[lit >> 1]
+        return value if value < 0 else value ^ (lit & 1)
+
+    def enqueue(self, lit, reason):
+        var = lit >> 1
+        self.values[var] = 1 - (lit & 1)
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        # Returns the index of a conflicting clause, or -1.
+        values, clauses, watches, trail = self.values, self.clauses, self.watches, self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.stats['propagations'] += 1
+            ws = watches[false_lit]
+            i = j = 0
+            while i < len(ws):
+                ci = ws[i]
+                i += 1
+                clause = clauses[ci]
+                if clause is None:
+                    continue
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                value = values[first >> 1]
+                if value >= 0 and value ^ (first & 1) == 1:
+                    ws[j] = ci
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    value = values[lit >> 1]
+                    if value < 0 or value ^ (lit & 1) == 1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(ci)
+                        break
+                else:
+                    ws[j] = ci
+                    j += 1
+                    value = values[first >> 1]
+                    if value >= 0:
+                        while i < len(ws):
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        del ws[j:]
+                        self.qhead = len(trail)
+                        return ci
+                    self.enqueue(first, ci)
+            del ws[j:]
+        return -1
+
+    def bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.var_inc *= 1e-100
+            self.rebuild_heap()
+        elif self.values[var] < 0:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def rebuild_heap(self):
+        self.heap = [(-self.activity[var], var) for var in range(self.n) if self.values[var] < 0]
+        heapq.heapify(self.heap)
+
+    def analyze(self, ci):
+        # First-UIP conflict analysis. Returns (learned clause with the
+        # asserting literal first, backjump level, LBD).
+        seen, level, reason, trail, clauses = self.seen, self.level, self.reason, self.trail, self.clauses
+        current_level = len(self.trail_lim)
+        learnt = [None]
+        counter = 0
+        p = None
+        index = len(trail) - 1
+        clause = clauses[ci]
+        while True:
+            for q in (clause if p is None else clause[1:]):
+                var = q >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    self.bump(var)
+                    if level[var] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            p = trail[index]
+            index -= 1
+            seen[p >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = clauses[reason[p >> 1]]
+        learnt[0] = p ^ 1
+
+        # Drop literals implied by the rest of the learned clause.
+        minimized = [learnt[0]]
+        for q in learnt[1:]:
+            r = reason[q >> 1]
+            if r == -1 or any(not seen[lit >> 1] and level[lit >> 1] > 0 for lit in clauses[r][1:]):
+                minimized.append(q)
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+
+        back_level = 0
+        if len(minimized) > 1:
+            max_index = max(range(1, len(minimized)), key=lambda k: level[minimized[k] >> 1])
+            minimized[1], minimized[max_index] = minimized[max_index], minimized[1]
+            back_level = level[minimized[1] >> 1]
+        lbd = len({level[lit >> 1] for lit in minimized})
+        return minimized, back_level, lbd
+
+    def cancel_until(self, target_level):
+        if len(self.trail_lim) <= target_level:
+            return
+        values, activity, heap = self.values, self.activity, self.heap
+        for i in range(len(self.trail) - 1, self.trail_lim[target_level] - 1, -1):
+            var = self.trail[i] >> 1
+            self.phase[var] = values[var] == 1
+            values[var] = -1
+            self.reason[var] = -1
+            heapq.heappush(heap, (-activity[var], var))
+        del self.trail[self.trail_lim[target_level]:]
+        del self.trail_lim[target_level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch_lit(self):
+        if len(self.heap) > 4 * self.n + 1000:
+            self.rebuild_heap()
+        while self.heap:
+            _, var = heapq.heappop(self.heap)
+            if self.values[var] < 0:
+                return 2 * var + (0 if self.phase[var] else 1)
+        return -1
+
+    def is_locked(self, ci):
+        first = self.clauses[ci][0]
+        return self.reason[first >> 1] == ci and self.lit_value(first) == 1
+
+    def reduce_db(self):
+        candidates = [ci for ci in self.learned if self.lbd[ci] > 2 and not self.is_locked(ci)]
+        candidates.sort(key=lambda ci: self.lbd[ci], reverse=True)
+        removed = set(candidates[:len(candidates) // 2])
+        for ci in removed:
+            self.clauses[ci] = None
+            del self.lbd[ci]
+        self.learned = [ci for ci in self.learned if ci not in removed]
+        self.stats['deleted'] += len(removed)
+
+    def search(self, conflict_limit, max_conflicts):
+        # Returns True (SAT), False (UNSAT) or None (restart / limit hit).
+        conflicts_here = 0
+        while True:
+            ci = self.propagate()
+            if ci != -1:
+                self.stats['conflicts'] += 1
+                conflicts_here += 1
+                if not self.trail_lim:
+                    return False
+                learnt, back_level, lbd = self.analyze(ci)
+                self.cancel_until(back_level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], -1)
+                else:
+                    ci = len(self.clauses)
+                    self.clauses.append(learnt)
+                    self.watches[learnt[0]].append(ci)
+                    self.watches[learnt[1]].append(ci)
+                    self.learned.append(ci)
+                    self.lbd[ci] = lbd
+                    self.stats['learned'] += 1
+                    self.enqueue(learnt[0], ci)
+                self.var_inc /= self.var_decay
+                if self.stats['conflicts'] >= self.next_reduce:
+                    self.next_reduce = self.stats['conflicts'] + self.reduce_interval
+                    self.reduce_db()
+            else:
+                if conflicts_here >= conflict_limit or (max_conflicts is not None and self.stats['conflicts'] >= max_conflicts):
+                    self.cancel_until(0)
+                    return None
+                lit = self.pick_branch_lit()
+                if lit == -1:
+                    return True
+                self.stats['decisions'] += 1
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(lit, -1)
+
+    def solve(self, max_conflicts=None):
+        # Returns True (SAT), False (UNSAT) or None if max_conflicts ran out.
+        if not self.ok or self.propagate() != -1:
+            return False
+        while True:
+            result = self.search(luby(self.stats['restarts'] + 1) * self.restart_base, max_conflicts)
+            if result is not None:
+                return result
+            if max_conflicts is not None and self.stats['conflicts'] >= max_conflicts:
+                return None
+            self.stats['restarts'] += 1
+
+    def model(self):
+        return [value == 1 for value in self.values]
+
+def cdcl_solve(formula, n, max_conflicts=None):
+
+    solver = CDCLSolver(formula, n)
+    result = solver.solve(max_conflicts)
+    stats = dict(solver.stats)
+    if result is True:
+        stats['status'] = 'SAT'
+        print("CDCL: Formula is SATISFIABLE.")
+    elif result is False:
+        stats['status'] = 'UNSAT'
+        print("CDCL: Formula is UNSATISFIABLE (proved).")
+    else:
+        stats['status'] = 'UNKNOWN'
+        print(f"CDCL: Gave up after {max_conflicts} conflicts.")
+    print(f"  - Conflicts: {stats['conflicts']}, Decisions: {stats['decisions']}, Restarts: {stats['restarts']}")
+    return (solver.model() if result else None), stats
+
+# Each portfolio task is one restart of one solver.
+PORTFOLIO_SOLVERS = {
+    'walksat': lambda formula, n: walksat(formula, n, method='probsat', max_restarts=1, max_flips=100000)[0],
+    'hill_climbing': lambda formula, n: hill_climbing(formula, n, max_restarts=1)[0],
+    'beam': lambda formula, n: beam_search_with_restarts(formula, n, beam_width=5, max_restarts=1),
+    'vnd': lambda formula, n: variable_neighborhood_descent_with_restarts(formula, n, max_restarts=1),
+}
+
+def portfolio_worker(worker_id, formula, n, tasks, stop_event, result_queue):
+
+    # Runs (solver, seed) tasks until one succeeds or another worker wins.
+    # Stats go out after every task, so they survive termination. A task
+    # whose solver raises counts as failed and the worker moves on.
+    stats = {'worker': worker_id, 'tasks': 0, 'failed': 0, 'solvers': {}, 'time': 0.0, 'winner': None}
+    start_time = time.time()
+    for solver_name, seed in tasks:
+        if stop_event.is_set():
+            break
+        random.seed(seed)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                assignment = PORTFOLIO_SOLVERS[solver_name](formula, n)
+        except Exception:
+            assignment = None
+            stats['failed'] += 1
+        stats['tasks'] += 1
+        stats['solvers'][solver_name] = stats['solvers'].get(solver_name, 0) + 1
+        stats['time'] = time.time() - start_time
+        if assignment is not None:
+            stats['winner'] = (solver_name, seed)
+            result_queue.put(('solved', worker_id, dict(stats), assignment))
+            return
+        result_queue.put(('progress', worker_id, dict(stats), None))
+    result_queue.put(('done', worker_id, dict(stats), None))
+
+def portfolio_solve(formula, n, num_workers=None, solvers=('walksat', 'hill_climbing', 'vnd', 'beam'),
+                    restarts_per_worker=50, base_seed=0, timeout=None):
+
+    # Worker w runs solvers in rotation starting at solvers[w % len(solvers)],
+    # each task with its own seed. The first satisfying assignment wins and
+    # every other worker is stopped. The queue is polled with a short
+    # timeout so a worker that dies without reporting is noticed.
+    num_workers = num_workers or multiprocessing.cpu_count()
+    start_time = time.time()
+    stop_event = multiprocessing.Event()
+    result_queue = multiprocessing.Queue()
+    workers = []
+    for worker_id in range(num_workers):
+        tasks = [(solvers[(worker_id + t) % len(solvers)], base_seed + worker_id * restarts_per_worker + t)
+                 for t in range(restarts_per_worker)]
+        workers.append(multiprocessing.Process(
+            target=portfolio_worker, args=(worker_id, formula, n, tasks, stop_event, result_queue)))
+    for worker in workers:
+        worker.start()
+
+    worker_stats = {}
+    solution = None
+    winner = None
+    finished = set()
+    while len(finished) < num_workers:
+        remaining = None if timeout is None else timeout - (time.time() - start_time)
+        if remaining is not None and remaining <= 0:
+            break
+        try:
+            kind, worker_id, stats, assignment = result_queue.get(
+                timeout=0.5 if remaining is None else min(remaining, 0.5))
+        except queue.Empty:
+            finished.update(worker_id for worker_id, worker in enumerate(workers) if not worker.is_alive())
+            continue
+        worker_stats[worker_id] = stats
+        if kind == 'solved' and h1_satisfied_clauses(formula, assignment) == len(formula):
+            solution, winner = assignment, worker_id
+            break
+        if kind in ('solved', 'done'):
+            finished.add(worker_id)
+
+    stop_event.set()
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.join()
+
+    elapsed = time.time() - start_time
+    if solution is not None:
+        solver_name, seed = worker_stats[winner]['winner']
+        print(f"Portfolio ({num_workers} workers): Solution found by {solver_name} (seed {seed}) on worker {winner}!")
+    else:
+        print(f"Portfolio ({num_workers} workers): No solution found.")
+    return solution, {
+        'time': elapsed,
+        'winner': winner,
+        'workers': [worker_stats.get(worker_id, {'worker': worker_id, 'tasks': 0, 'failed': 0, 'solvers': {}, 'time': elapsed, 'winner': None})
+                    for worker_id in range(num_workers)],
+    }
 
 if __name__ == '__main__':
     print("="*50)
@@ -164,7 +1013,22 @@ if __name__ == '__main__':
     beam_search_with_restarts(problem_3sat, n_vars, beam_width=5)
     print(f"Time taken: {time.time() - start_time:.4f} seconds")
 
+    print("\nSolving with probSAT ")
+    start_time = time.time()
+    walksat(problem_3sat, n_vars, method='probsat', max_flips=100000)
+    print(f"Time taken: {time.time() - start_time:.4f} seconds")
+
     print("\nSolving with Variable Neighborhood Descent with Restarts ")
     start_time = time.time()
     variable_neighborhood_descent_with_restarts(problem_3sat, n_vars)
+    print(f"Time taken: {time.time() - start_time:.4f} seconds")
+
+    print("\nSolving with CDCL (complete) ")
+    start_time = time.time()
+    cdcl_solve(problem_3sat, n_vars)
+    print(f"Time taken: {time.time() - start_time:.4f} seconds")
+
+    print("\nSolving with the parallel solver portfolio ")
+    start_time = time.time()
+    portfolio_solve(problem_3sat, n_vars)
     print(f"Time taken: {time.time() - start_time:.4f} seconds")
\ No newline at end of file
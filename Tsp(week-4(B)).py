@@ -2,23 +2,132 @@ import numpy as np
 import matplotlib.pyplot as plt
 import random
 import math
+import argparse
+import os
+import re
+import json
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+# Above this many cities the dense float64 matrix (n * n * 8 bytes) no
+# longer fits comfortably, so distances are computed from coordinates.
+DENSE_DISTANCE_LIMIT = 4000
+
+# Distance types from the TSPLIB EDGE_WEIGHT_TYPE header that are honoured;
+# anything else falls back to plain (unrounded) Euclidean distances.
+TSPLIB_METRICS = ('EUC_2D', 'CEIL_2D', 'GEO', 'ATT')
+GEO_EARTH_RADIUS = 6378.388
+
+def read_tsplib_header(f):
+    
+    # KEY : VALUE lines up to the first *_SECTION line, which is recorded
+    # under 'SECTION'.
+    header = {}
+    for line in f:
+        line = line.strip()
+        if line.endswith("SECTION"):
+            header['SECTION'] = line
+            break
+        if ':' in line:
+            key, value = line.split(':', 1)
+            header[key.strip().upper()] = value.strip()
+    return header
+
+def load_tsplib(filename, use_cache=True):
+    
+    # Returns (coords, header). The coordinate section is converted with
+    # NumPy in one pass and saved next to the file as <filename>.npy;
+    # later runs memory-map that sidecar while it is newer than the file.
+    sidecar = filename + '.npy'
+    with open(filename, 'r') as f:
+        header = read_tsplib_header(f)
+        if use_cache and os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(filename):
+            return np.load(sidecar, mmap_mode='r'), header
+        text = f.read()
+    if header.get('SECTION') != "NODE_COORD_SECTION":
+        raise ValueError(f"{filename} has no NODE_COORD_SECTION")
+
+    end = re.search(r'^\s*(EOF|\w+_SECTION)\s*$', text, re.MULTILINE)
+    if end:
+        text = text[:end.start()]
+    coords = np.array(text.split(), dtype=np.float64).reshape(-1, 3)[:, 1:3].copy()
+    if use_cache:
+        try:
+            np.save(sidecar, coords)
+        except OSError:
+            pass
+    return coords, header
+
+def tsplib_metric(header):
+    
+    edge_weight_type = header.get('EDGE_WEIGHT_TYPE', '').upper()
+    return edge_weight_type if edge_weight_type in TSPLIB_METRICS else 'euclidean'
 
 def parse_tsp_file(filename):
    
-    coords = []
-    with open(filename, 'r') as f:
-        for line in f:
-            if line.strip() == "NODE_COORD_SECTION":
-                break
-        for line in f:
-            line = line.strip()
-            if line == "EOF" or "SECTION" in line:
-                break
-            if line:
-                parts = line.split()
-                coords.append([float(parts[1]), float(parts[2])])
+    coords, header = load_tsplib(filename)
     print(f"Parsed {len(coords)} coordinates from {filename}.")
-    return np.array(coords)
+    return coords
+
+def metric_coordinates(coords, metric):
+    
+    # GEO coordinates are DDD.MM degrees/minutes; TSPLIB turns them into
+    # (latitude, longitude) radians with PI = 3.141592 before measuring.
+    coords = np.asarray(coords, dtype=np.float64)
+    if metric != 'GEO':
+        return coords
+    degrees = np.trunc(coords)
+    return 3.141592 * (degrees + 5.0 * (coords - degrees) / 3.0) / 180.0
+
+def pair_distances(metric, x1, y1, x2, y2):
+    
+    # Vectorised TSPLIB distance between points given in metric_coordinates.
+    if metric == 'GEO':
+        q1 = np.cos(y1 - y2)
+        q2 = np.cos(x1 - x2)
+        q3 = np.cos(x1 + x2)
+        arc = np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0))
+        return np.floor(GEO_EARTH_RADIUS * arc + 1.0)
+    dist = np.hypot(x1 - x2, y1 - y2)
+    if metric == 'EUC_2D':
+        return np.floor(dist + 0.5)
+    if metric == 'CEIL_2D':
+        return np.ceil(dist)
+    if metric == 'ATT':
+        r = dist / math.sqrt(10.0)
+        t = np.floor(r + 0.5)
+        return np.where(t < r, t + 1.0, t)
+    return dist
+
+def pair_distance_function(metric):
+    
+    # Scalar twin of pair_distances for one lookup at a time.
+    if metric == 'GEO':
+        def distance(x1, y1, x2, y2):
+            q1 = math.cos(y1 - y2)
+            q2 = math.cos(x1 - x2)
+            q3 = math.cos(x1 + x2)
+            arc = math.acos(max(-1.0, min(1.0, 0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3))))
+            return float(int(GEO_EARTH_RADIUS * arc + 1.0))
+    elif metric == 'EUC_2D':
+        def distance(x1, y1, x2, y2):
+            return float(int(math.hypot(x1 - x2, y1 - y2) + 0.5))
+    elif metric == 'CEIL_2D':
+        def distance(x1, y1, x2, y2):
+            return float(math.ceil(math.hypot(x1 - x2, y1 - y2)))
+    elif metric == 'ATT':
+        def distance(x1, y1, x2, y2):
+            r = math.hypot(x1 - x2, y1 - y2) / math.sqrt(10.0)
+            t = int(r + 0.5)
+            return float(t + 1 if t < r else t)
+    elif metric == 'euclidean':
+        def distance(x1, y1, x2, y2):
+            return math.hypot(x1 - x2, y1 - y2)
+    else:
+        raise ValueError(f"Unknown distance metric: {metric}")
+    return distance
 
 def calculate_total_distance(tour, distance_matrix):
   
@@ -41,34 +150,723 @@ def plot_tour(coords, tour, filename):
     plt.grid(True)
     plt.show()
 
-def simulated_annealing_tsp(coords, initial_temp, cooling_rate, stopping_temp):
+def build_distance_matrix(coords, block_size=512, metric='euclidean'):
+    
+    # Fill the dense matrix a block of rows at a time so no n x n x 2
+    # broadcast intermediate is ever allocated.
+    num_cities = len(coords)
+    points = metric_coordinates(coords, metric)
+    xs, ys = points[:, 0], points[:, 1]
+    distance_matrix = np.empty((num_cities, num_cities))
+    for start in range(0, num_cities, block_size):
+        stop = min(start + block_size, num_cities)
+        distance_matrix[start:stop] = pair_distances(metric, xs[start:stop, np.newaxis], ys[start:stop, np.newaxis], xs, ys)
+    return distance_matrix
+
+class CoordinateDistance:
+    
+    # Matrix-free stand-in for distance_matrix: distance_matrix[a, b] is
+    # computed from the coordinates on demand, so memory stays O(n).
+    # With cached_neighbors = k > 0 the distances from every city to its k
+    # nearest neighbours are computed up front and looked up, an O(n * k)
+    # table that never evicts; other pairs are still computed on demand.
+    def __init__(self, coords, cached_neighbors=0, metric='euclidean', neighbors=None):
+        
+        points = metric_coordinates(coords, metric)
+        self.xs = points[:, 0].tolist()
+        self.ys = points[:, 1].tolist()
+        self.distance = pair_distance_function(metric)
+        self.num_cities = len(self.xs)
+        self.cache = {}
+        if cached_neighbors and self.num_cities > 1:
+            if neighbors is None or neighbors.shape[1] < min(cached_neighbors, self.num_cities - 1):
+                neighbors = build_neighbor_lists(coords, cached_neighbors)
+            near = neighbors[:, :cached_neighbors].astype(np.int64)
+            cities = np.repeat(np.arange(self.num_cities), near.shape[1])
+            near = near.ravel()
+            dists = pair_distances(metric, points[cities, 0], points[cities, 1], points[near, 0], points[near, 1])
+            keys = np.minimum(cities, near) * self.num_cities + np.maximum(cities, near)
+            self.cache = dict(zip(keys.tolist(), dists.tolist()))
+
+    def __len__(self):
+        
+        return self.num_cities
+
+    def __getitem__(self, pair):
+        
+        a, b = pair
+        if self.cache:
+            a, b = int(a), int(b)
+            dist = self.cache.get(a * self.num_cities + b if a < b else b * self.num_cities + a)
+            if dist is not None:
+                return dist
+        return self.distance(self.xs[a], self.ys[a], self.xs[b], self.ys[b])
+
+def make_distance_provider(coords, dense_limit=DENSE_DISTANCE_LIMIT, cached_neighbors=0, metric='euclidean',
+                           neighbors=None):
+    
+    # Both providers are indexed as distance_matrix[a, b].
+    if len(coords) <= dense_limit:
+        return build_distance_matrix(coords, metric=metric)
+    return CoordinateDistance(coords, cached_neighbors, metric, neighbors)
+
+def two_opt_delta(tour, i, j, distance_matrix):
+    
+    # Length change when tour[i..j] is reversed (i < j).
+    num_cities = len(tour)
+    if i == 0 and j == num_cities - 1:
+        return 0.0
+    a, b = tour[i - 1], tour[i]
+    c, d = tour[j], tour[(j + 1) % num_cities]
+    return (distance_matrix[a, c] + distance_matrix[b, d]
+            - distance_matrix[a, b] - distance_matrix[c, d])
+
+def grid_shape(span, num_cells):
+    
+    # Square cells covering a span_x x span_y box in about num_cells cells,
+    # with the cell count on each axis proportional to its span. Returns the
+    # cell side and the (columns, rows) counts. A box too thin for one row
+    # of square cells (collinear points) becomes a single row.
+    wide, narrow = float(max(span)), float(min(span))
+    cell_size = math.sqrt(wide * narrow / num_cells)
+    if cell_size > narrow:
+        cell_size = wide / num_cells
+    cell_size = max(cell_size, 1e-12)
+    return cell_size, (max(1, int(math.ceil(span[0] / cell_size))), max(1, int(math.ceil(span[1] / cell_size))))
+
+def build_neighbor_lists(coords, k=8):
+    
+    # k nearest neighbours of every city, nearest first, found by bucketing
+    # the cities into a grid of square cells, about two cities per cell, and
+    # searching square rings of cells around each cell until the k-th
+    # distance is provably inside the searched block.
+    num_cities = len(coords)
+    k = min(k, num_cities - 1)
+    low = coords.min(axis=0)
+    span = np.maximum(coords.max(axis=0) - low, 1e-12)
+    ring_width, (cols, rows) = grid_shape(span, max(1.0, num_cities / 2.0))
+    cell_xy = np.minimum((coords - low) / ring_width, [cols - 1, rows - 1]).astype(np.int64)
+    cell_id = cell_xy[:, 0] * rows + cell_xy[:, 1]
+    order = np.argsort(cell_id, kind='stable')
+    cell_start = np.searchsorted(cell_id[order], np.arange(cols * rows + 1))
+
+    neighbors = np.empty((num_cities, k), dtype=np.int32)
+    for cell in np.unique(cell_id):
+        members = order[cell_start[cell]:cell_start[cell + 1]]
+        cx, cy = divmod(int(cell), rows)
+        radius = 1
+        while True:
+            x0, x1 = max(cx - radius, 0), min(cx + radius, cols - 1)
+            y0, y1 = max(cy - radius, 0), min(cy + radius, rows - 1)
+            candidates = np.concatenate([order[cell_start[x * rows + y0]:cell_start[x * rows + y1 + 1]]
+                                         for x in range(x0, x1 + 1)])
+            covers_all = x0 == 0 and y0 == 0 and x1 == cols - 1 and y1 == rows - 1
+            if len(candidates) > k:
+                dists = np.hypot(coords[members, 0, np.newaxis] - coords[candidates, 0],
+                                 coords[members, 1, np.newaxis] - coords[candidates, 1])
+                dists[candidates[np.newaxis, :] == members[:, np.newaxis]] = np.inf
+                nearest = np.argpartition(dists, k - 1, axis=1)[:, :k]
+                kth = np.take_along_axis(dists, nearest, axis=1)
+                if covers_all or kth.max() <= radius * ring_width:
+                    ranked = np.argsort(kth, axis=1)
+                    neighbors[members] = candidates[np.take_along_axis(nearest, ranked, axis=1)]
+                    break
+            radius += 1
+    return neighbors
+
+class Tour:
+    
+    # Tour stored as an int32 city order plus a city -> position index, so
+    # next/prev are O(1) and a 2-opt reversal touches only the shorter of
+    # the two paths it could flip (both give the same cycle).
+    def __init__(self, cities):
+        
+        self.order = np.array(cities, dtype=np.int32)
+        self.num_cities = len(self.order)
+        self.pos = np.empty(self.num_cities, dtype=np.int32)
+        self.pos[self.order] = np.arange(self.num_cities, dtype=np.int32)
+
+    def __len__(self):
+        
+        return self.num_cities
+
+    def next(self, city):
+        
+        return int(self.order[(int(self.pos[city]) + 1) % self.num_cities])
+
+    def prev(self, city):
+        
+        return int(self.order[(int(self.pos[city]) - 1) % self.num_cities])
+
+    def step(self, city, offset):
+        
+        return int(self.order[(int(self.pos[city]) + offset) % self.num_cities])
+
+    def reverse(self, i, j):
+        
+        # Reverse the path from position i forward to position j (wrapping
+        # when j < i), or equivalently the complementary path, whichever
+        # is shorter.
+        length = (j - i) % self.num_cities + 1
+        if 2 * length > self.num_cities:
+            i, j = (j + 1) % self.num_cities, (i - 1) % self.num_cities
+            length = self.num_cities - length
+        if length < 2:
+            return
+        if i <= j:
+            segment = self.order[i:j+1][::-1].copy()
+            self.order[i:j+1] = segment
+            self.pos[segment] = np.arange(i, j + 1, dtype=np.int32)
+        else:
+            index = np.arange(i, i + length) % self.num_cities
+            segment = self.order[index][::-1]
+            self.order[index] = segment
+            self.pos[segment] = index
+
+    def make_2opt_move(self, t1, t2, t3, t4):
+        
+        # Replace edges (t1, t2) and (t3, t4) by (t1, t3) and (t2, t4), where
+        # t2 follows t1 and t4 follows t3 in one of the two tour directions.
+        if self.next(t1) == t2:
+            self.reverse(int(self.pos[t2]), int(self.pos[t3]))
+        else:
+            self.reverse(int(self.pos[t1]), int(self.pos[t4]))
+
+    def make_or_move(self, s1, s2, c, d, c_joins_s1):
+        
+        # Move the path s1..s2 (s2 reached from s1 going forward) between the
+        # adjacent cities c and d, joining c to s1 when c_joins_s1 and to s2
+        # otherwise. Done as two or three 2-opt moves.
+        p = self.prev(s1)
+        nx = self.next(s2)
+        if self.next(c) != d:
+            c, d, c_joins_s1 = d, c, not c_joins_s1
+        self.make_2opt_move(p, s1, c, d)
+        self.make_2opt_move(p, c, nx, s2)
+        if c_joins_s1:
+            self.make_2opt_move(c, s2, s1, d)
+
+    def snapshot(self):
+        
+        return self.order.copy()
+
+    def tolist(self):
+        
+        return self.order.tolist()
+
+def or_opt_gain(distance_matrix, p, s1, s2, nx, c, d):
+    
+    # Gain of moving s1..s2 from between p and nx to between c and d, with
+    # the better of the two segment orientations.
+    removed = distance_matrix[p, s1] + distance_matrix[s2, nx] + distance_matrix[c, d]
+    join_s1 = distance_matrix[c, s1] + distance_matrix[s2, d]
+    join_s2 = distance_matrix[c, s2] + distance_matrix[s1, d]
+    if join_s1 <= join_s2:
+        return removed - distance_matrix[p, nx] - join_s1, True
+    return removed - distance_matrix[p, nx] - join_s2, False
+
+def improve_city(tour, neighbors, distance_matrix, a, use_or_opt, eps=1e-9):
     
+    # First improving neighbour-list move around city a, applied in place.
+    # Returns the cities whose edges changed, or None.
+    num_cities = len(tour)
+    for step in (1, -1):
+        b = tour.step(a, step)
+        d_ab = distance_matrix[a, b]
+        for c in neighbors[a]:
+            g1 = d_ab - distance_matrix[a, c]
+            if g1 <= eps:
+                break
+            d = tour.step(c, step)
+            if c == b or d == a:
+                continue
+            if g1 + distance_matrix[c, d] - distance_matrix[b, d] > eps:
+                tour.make_2opt_move(a, b, c, d)
+                return (a, b, c, d)
+
+    if not use_or_opt:
+        return None
+    for length in range(1, 4):
+        if length + 2 >= num_cities:
+            break
+        for step in ((1, -1) if length > 1 else (1,)):
+            # Segment of `length` cities starting at a, walking forward or back.
+            end = tour.step(a, step * (length - 1))
+            s1, s2 = (a, end) if step == 1 else (end, a)
+            segment = [tour.step(s1, offset) for offset in range(length)]
+            p = tour.prev(s1)
+            nx = tour.next(s2)
+            removed = distance_matrix[p, s1] + distance_matrix[s2, nx] - distance_matrix[p, nx]
+            if removed <= eps:
+                continue
+            blocked = set(segment)
+            blocked.add(p)
+            blocked.add(nx)
+            for x in (s1, s2):
+                for c in neighbors[x]:
+                    if distance_matrix[x, c] >= removed:
+                        break
+                    if c in blocked:
+                        continue
+                    for d in (tour.next(c), tour.prev(c)):
+                        if d in blocked:
+                            continue
+                        gain, c_joins_s1 = or_opt_gain(distance_matrix, p, s1, s2, nx, c, d)
+                        if gain > eps:
+                            tour.make_or_move(s1, s2, c, d, c_joins_s1)
+                            return (p, nx, c, d, s1, s2)
+    return None
+
+def local_search_tsp(coords, tour=None, neighbors=None, neighbor_k=8, use_or_opt=True,
+                     distance_matrix=None, dense_limit=DENSE_DISTANCE_LIMIT, metric='euclidean'):
+    
+    # 2-opt + Or-opt over candidate neighbour lists with don't-look bits:
+    # only cities whose edges changed recently are re-examined.
+    num_cities = len(coords)
+    if distance_matrix is None:
+        distance_matrix = make_distance_provider(coords, dense_limit, metric=metric)
+    if neighbors is None:
+        neighbors = build_neighbor_lists(coords, neighbor_k)
+    if isinstance(neighbors, np.ndarray):
+        neighbors = neighbors.tolist()
+    if tour is None:
+        tour = list(range(num_cities))
+        random.shuffle(tour)
+    tour = Tour(tour)
+
+    queue = deque(tour.tolist())
+    queued = [True] * num_cities
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        touched = improve_city(tour, neighbors, distance_matrix, a, use_or_opt)
+        if touched is None:
+            continue
+        for city in touched:
+            if not queued[city]:
+                queued[city] = True
+                queue.append(city)
+    tour = tour.tolist()
+    return tour, calculate_total_distance(tour, distance_matrix)
+
+def propose_neighbor_move(tour, neighbors, distance_matrix):
+    
+    # Random candidate-list move for annealing: a 2-opt move adding the
+    # edge from a random city to one of its near neighbours, or an Or-opt
+    # move of a short segment next to a neighbour. Returns (delta, apply).
+    num_cities = len(tour)
+    a = random.randrange(num_cities)
+    c = random.choice(neighbors[a])
+    step = random.choice((1, -1))
+    if random.random() < 0.5 or num_cities < 8:
+        b = tour.step(a, step)
+        d = tour.step(c, step)
+        if c == b or d == a:
+            return None
+        delta = (distance_matrix[a, c] + distance_matrix[b, d]
+                 - distance_matrix[a, b] - distance_matrix[c, d])
+        return delta, lambda: tour.make_2opt_move(a, b, c, d)
+
+    # Segment of 1-3 cities starting at the neighbour c, moved next to a.
+    length = random.randint(1, 3)
+    end = tour.step(c, step * (length - 1))
+    s1, s2 = (c, end) if step == 1 else (end, c)
+    segment = {tour.step(s1, offset) for offset in range(length)}
+    p = tour.prev(s1)
+    nx = tour.next(s2)
+    d = tour.step(a, random.choice((1, -1)))
+    if a in segment or d in segment or a in (p, nx) or d in (p, nx):
+        return None
+    gain, c_joins_s1 = or_opt_gain(distance_matrix, p, s1, s2, nx, a, d)
+    return -gain, lambda: tour.make_or_move(s1, s2, a, d, c_joins_s1)
+
+class GridIndex:
+    
+    # Nearest-point queries over a shrinking point set; the grid is rebuilt
+    # coarser as points are removed.
+    def __init__(self, coords, members=None, per_cell=2):
+        
+        self.coords = coords
+        self.per_cell = per_cell
+        self.build(range(len(coords)) if members is None else members)
+
+    def build(self, members):
+        
+        members = list(members)
+        self.count = len(members)
+        points = self.coords[members] if members else np.zeros((1, 2))
+        self.low = points.min(axis=0)
+        span = np.maximum(points.max(axis=0) - self.low, 1e-12)
+        self.ring_width, (self.cols, self.rows) = grid_shape(span, max(self.count, 1) / self.per_cell)
+        self.cells = {}
+        for p in members:
+            self.cells.setdefault(self.cell_of(self.coords[p, 0], self.coords[p, 1]), set()).add(p)
+
+    def cell_of(self, x, y):
+        
+        cx = min(max(int((x - self.low[0]) / self.ring_width), 0), self.cols - 1)
+        cy = min(max(int((y - self.low[1]) / self.ring_width), 0), self.rows - 1)
+        return cx, cy
+
+    def remove(self, p):
+        
+        cell = self.cell_of(self.coords[p, 0], self.coords[p, 1])
+        self.cells[cell].discard(p)
+        if not self.cells[cell]:
+            del self.cells[cell]
+        self.count -= 1
+        if self.cols * self.rows > 1 and self.count * self.per_cell * 8 < self.cols * self.rows:
+            self.build(p for members in self.cells.values() for p in members)
+
+    def nearest(self, x, y):
+        
+        if not self.count:
+            return None
+        cx, cy = self.cell_of(x, y)
+        best, best_dist = None, math.inf
+        for radius in range(max(self.cols, self.rows) + 1):
+            x0, x1 = max(cx - radius, 0), min(cx + radius, self.cols - 1)
+            y0, y1 = max(cy - radius, 0), min(cy + radius, self.rows - 1)
+            # Only the cells on the ring: its left and right columns in full,
+            # its top and bottom rows between them, each if inside the grid.
+            ring = [(gx, gy) for gx in {cx - radius, cx + radius} if x0 <= gx <= x1 for gy in range(y0, y1 + 1)]
+            ring += [(gx, gy) for gy in {cy - radius, cy + radius} if y0 <= gy <= y1
+                     for gx in range(max(cx - radius + 1, 0), min(cx + radius - 1, self.cols - 1) + 1)]
+            for cell in ring:
+                for p in self.cells.get(cell, ()):
+                    dist = math.hypot(self.coords[p, 0] - x, self.coords[p, 1] - y)
+                    if dist < best_dist:
+                        best, best_dist = p, dist
+            if best is not None and best_dist <= radius * self.ring_width:
+                break
+        return best
+
+def nearest_neighbor_tour(coords, neighbors=None, start=0, neighbor_k=8):
+    
+    # Candidate lists first; the grid only when a city's whole list is visited.
+    coords = np.asarray(coords, dtype=np.float64)
+    num_cities = len(coords)
+    if neighbors is None:
+        neighbors = build_neighbor_lists(coords, neighbor_k)
+    if isinstance(neighbors, np.ndarray):
+        neighbors = neighbors.tolist()
+    index = GridIndex(coords)
+    visited = [False] * num_cities
+    tour = [start]
+    visited[start] = True
+    index.remove(start)
+    current = start
+    for _ in range(num_cities - 1):
+        for city in neighbors[current]:
+            if not visited[city]:
+                break
+        else:
+            city = index.nearest(coords[current, 0], coords[current, 1])
+        tour.append(city)
+        visited[city] = True
+        index.remove(city)
+        current = city
+    return tour
+
+def candidate_edges(coords, neighbors):
+    
+    # Unique candidate-list edges (i < j), shortest first.
+    num_cities, k = neighbors.shape
+    pairs = np.column_stack([np.repeat(np.arange(num_cities), k), np.asarray(neighbors).ravel()])
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    lengths = np.hypot(*(coords[pairs[:, 0]] - coords[pairs[:, 1]]).T)
+    return pairs[np.argsort(lengths, kind='stable')].tolist()
+
+def find_root(parent, city):
+    
+    while parent[city] != city:
+        parent[city] = parent[parent[city]]
+        city = parent[city]
+    return city
+
+def join_fragments(coords, fragments):
+    
+    # Chains path fragments into one tour, always continuing to the
+    # nearest free fragment end.
+    end_owner = {}
+    for fragment_id, fragment in enumerate(fragments):
+        end_owner[fragment[0]] = fragment_id
+        end_owner[fragment[-1]] = fragment_id
+    index = GridIndex(coords, end_owner)
+    tour = []
+    fragment = fragments[0]
+    while True:
+        index.remove(fragment[0])
+        if fragment[-1] != fragment[0]:
+            index.remove(fragment[-1])
+        tour.extend(fragment)
+        end = index.nearest(coords[tour[-1], 0], coords[tour[-1], 1])
+        if end is None:
+            return tour
+        fragment = fragments[end_owner[end]]
+        if fragment[0] != end:
+            fragment = fragment[::-1]
+
+def greedy_edge_tour(coords, neighbors=None, neighbor_k=8):
+    
+    # Greedy matching over the candidate edges, then the paths are chained.
+    coords = np.asarray(coords, dtype=np.float64)
+    num_cities = len(coords)
+    if neighbors is None:
+        neighbors = build_neighbor_lists(coords, neighbor_k)
+    parent = list(range(num_cities))
+    adjacent = [[] for _ in range(num_cities)]
+    for a, b in candidate_edges(coords, neighbors):
+        if len(adjacent[a]) < 2 and len(adjacent[b]) < 2:
+            root_a, root_b = find_root(parent, a), find_root(parent, b)
+            if root_a != root_b:
+                parent[root_a] = root_b
+                adjacent[a].append(b)
+                adjacent[b].append(a)
+
+    fragments = []
+    seen = [False] * num_cities
+    for city in range(num_cities):
+        if seen[city] or len(adjacent[city]) == 2:
+            continue
+        fragment = [city]
+        seen[city] = True
+        previous, current = None, city
+        while True:
+            following = [other for other in adjacent[current] if other != previous]
+            if not following:
+                break
+            previous, current = current, following[0]
+            fragment.append(current)
+            seen[current] = True
+        fragments.append(fragment)
+    return join_fragments(coords, fragments)
+
+def space_filling_curve_tour(coords, bits=16):
+    
+    # Visit the cities in Hilbert-curve order over a 2^bits x 2^bits grid.
+    coords = np.asarray(coords, dtype=np.float64)
+    side = 1 << bits
+    low = coords.min(axis=0)
+    span = np.maximum(coords.max(axis=0) - low, 1e-12)
+    scaled = ((coords - low) / span * (side - 1)).astype(np.int64)
+    x, y = scaled[:, 0], scaled[:, 1]
+    d = np.zeros(len(coords), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = ((x & s) > 0).astype(np.int64)
+        ry = ((y & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve stays continuous.
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry == 0, y, x), np.where(ry == 0, x, y)
+        s >>= 1
+    return np.argsort(d, kind='stable').tolist()
+
+def mst_tour(coords, neighbors=None, neighbor_k=8):
+    
+    # Kruskal's spanning forest over the candidate edges, each tree walked in
+    # depth-first preorder, trees taken in space-filling-curve order.
+    coords = np.asarray(coords, dtype=np.float64)
+    num_cities = len(coords)
+    if neighbors is None:
+        neighbors = build_neighbor_lists(coords, neighbor_k)
+    parent = list(range(num_cities))
+    adjacent = [[] for _ in range(num_cities)]
+    for a, b in candidate_edges(coords, neighbors):
+        root_a, root_b = find_root(parent, a), find_root(parent, b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            adjacent[a].append(b)
+            adjacent[b].append(a)
+
+    tour = []
+    seen = [False] * num_cities
+    for root in space_filling_curve_tour(coords):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [root]
+        while stack:
+            city = stack.pop()
+            tour.append(city)
+            for other in adjacent[city]:
+                if not seen[other]:
+                    seen[other] = True
+                    stack.append(other)
+    return tour
+
+INITIAL_TOUR_METHODS = ('random', 'nearest_neighbor', 'greedy', 'space_filling_curve', 'mst')
+
+def build_initial_tour(coords, method='random', neighbors=None, neighbor_k=8):
+    
+    if method == 'random':
+        tour = list(range(len(coords)))
+        random.shuffle(tour)
+        return tour
+    if method == 'space_filling_curve':
+        return space_filling_curve_tour(coords)
+    if neighbors is None:
+        neighbors = build_neighbor_lists(coords, neighbor_k)
+    if method == 'nearest_neighbor':
+        return nearest_neighbor_tour(coords, neighbors, start=random.randrange(len(coords)))
+    if method == 'greedy':
+        return greedy_edge_tour(coords, neighbors)
+    if method == 'mst':
+        return mst_tour(coords, neighbors)
+    raise ValueError(f"Unknown initial tour method: {method}")
+
+def initial_temperature(tour, distance_matrix, acceptance=0.1):
+    
+    # Accept a one-edge (mean + std) uphill move with probability `acceptance`.
+    num_cities = len(tour)
+    edges = np.array([distance_matrix[tour[i], tour[(i + 1) % num_cities]] for i in range(num_cities)])
+    return max(float(edges.mean() + edges.std()), 1e-9) / -math.log(acceptance)
+
+def simulated_annealing_tsp(coords, initial_temp, cooling_rate, stopping_temp,
+                            dense_limit=DENSE_DISTANCE_LIMIT, cached_neighbors=0,
+                            moves='random', neighbor_k=8, metric='euclidean',
+                            initial_tour='random'):
+    
+    # initial_tour is one of INITIAL_TOUR_METHODS or an explicit tour.
+    # initial_temp=None derives the starting temperature from that tour.
+    # Returns the best tour, its cost and the number of iterations run.
     num_cities = len(coords)
-    distance_matrix = np.sqrt(((coords[:, np.newaxis, :] - coords[np.newaxis, :, :]) ** 2).sum(axis=2))
-    current_solution = list(range(num_cities))
-    random.shuffle(current_solution)
-    current_cost = calculate_total_distance(current_solution, distance_matrix)
-    best_solution = list(current_solution)
+    neighbors = None
+    if moves == 'neighbor' or (isinstance(initial_tour, str) and initial_tour in ('nearest_neighbor', 'greedy', 'mst')):
+        neighbors = build_neighbor_lists(coords, neighbor_k)
+    distance_matrix = make_distance_provider(coords, dense_limit, cached_neighbors, metric, neighbors)
+    if isinstance(initial_tour, str):
+        initial_solution = build_initial_tour(coords, initial_tour, neighbors)
+    else:
+        initial_solution = list(initial_tour)
+    current_solution = Tour(initial_solution)
+    current_cost = calculate_total_distance(initial_solution, distance_matrix)
     best_cost = current_cost
+    # The best tour is only copied when the walk is about to leave it.
+    best_solution = None
+    at_best = True
+    if initial_temp is None:
+        initial_temp = initial_temperature(initial_solution, distance_matrix)
     temperature = initial_temp
+    if moves == 'neighbor':
+        neighbors = neighbors.tolist()
+    iterations = 0
 
     while temperature > stopping_temp:
-        i, j = sorted(random.sample(range(num_cities), 2))
-        neighbor_solution = current_solution[:i] + current_solution[i:j+1][::-1] + current_solution[j+1:]
-        neighbor_cost = calculate_total_distance(neighbor_solution, distance_matrix)
-        cost_delta = neighbor_cost - current_cost
+        iterations += 1
+        if moves == 'neighbor':
+            move = propose_neighbor_move(current_solution, neighbors, distance_matrix)
+            if move is None:
+                temperature *= cooling_rate
+                continue
+            cost_delta, apply_move = move
+        else:
+            i, j = sorted(random.sample(range(num_cities), 2))
+            cost_delta = two_opt_delta(current_solution.order, i, j, distance_matrix)
         
         if cost_delta < 0 or (temperature > 1e-9 and random.random() < math.exp(-cost_delta / temperature)):
-            current_solution = neighbor_solution
-            current_cost = neighbor_cost
+            if at_best and cost_delta > 0:
+                best_solution = current_solution.snapshot()
+                at_best = False
+            if moves == 'neighbor':
+                apply_move()
+            else:
+                current_solution.reverse(i, j)
+            current_cost += cost_delta
         
-        if current_cost < best_cost:
-            best_solution = list(current_solution)
-            best_cost = current_cost
+            if current_cost < best_cost:
+                best_cost = current_cost
+                at_best = True
             
         temperature *= cooling_rate
         
-    return best_solution, best_cost
+    if at_best:
+        best_solution = current_solution.snapshot()
+    return best_solution.tolist(), best_cost, iterations
+
+# Coordinates of every batch instance, attached from shared memory once per worker.
+_batch_coords = {}
+_batch_segments = []
+
+def batch_worker_init(shared_specs):
+    
+    for instance, (name, shape, metric) in shared_specs.items():
+        segment = shared_memory.SharedMemory(name=name)
+        _batch_segments.append(segment)
+        _batch_coords[instance] = (np.ndarray(shape, dtype=np.float64, buffer=segment.buf), metric)
+
+def batch_worker(job):
+    
+    # One (instance, seed, schedule) run. Errors are reported in the
+    # result instead of killing the whole sweep.
+    result = dict(job)
+    start_time = time.time()
+    try:
+        random.seed(job['seed'])
+        np.random.seed(job['seed'])
+        coords, metric = _batch_coords[job['instance']]
+        tour, cost, iterations = simulated_annealing_tsp(
+            coords, job['initial_temp'], job['cooling_rate'], job['stopping_temp'],
+            moves=job.get('moves', 'random'), metric=metric,
+            initial_tour=job.get('initial_tour', 'random'))
+        result['metric'] = metric
+        result['cost'] = float(cost)
+        result['tour'] = [int(city) for city in tour]
+        result['iterations'] = iterations
+    except Exception as e:
+        result['error'] = repr(e)
+    result['time'] = time.time() - start_time
+    return result
+
+def run_batch(jobs, output_path, num_workers=None):
+    
+    # Runs every job on a process pool and appends one JSON line per result
+    # to output_path as soon as it finishes. Each instance is parsed once
+    # and shared with the workers through shared memory, not pickled.
+    num_workers = num_workers or multiprocessing.cpu_count()
+    segments = []
+    shared_specs = {}
+    results = []
+    try:
+        for instance in sorted({job['instance'] for job in jobs}):
+            try:
+                coords, header = load_tsplib(instance)
+                coords = np.ascontiguousarray(coords, dtype=np.float64)
+            except FileNotFoundError:
+                print(f"Error: Could not find {instance}. Skipping its runs.")
+                continue
+            segment = shared_memory.SharedMemory(create=True, size=max(coords.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(coords.shape, dtype=np.float64, buffer=segment.buf)[:] = coords
+            shared_specs[instance] = (segment.name, coords.shape, tsplib_metric(header))
+
+        with open(output_path, 'a') as out, multiprocessing.Pool(
+                num_workers, initializer=batch_worker_init, initargs=(shared_specs,)) as pool:
+            jobs = [job for job in jobs if job['instance'] in shared_specs]
+            for result in pool.imap_unordered(batch_worker, jobs):
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                results.append(result)
+                status = f"cost {result['cost']:.2f}" if 'cost' in result else f"error {result['error']}"
+                print(f"{result['instance']} seed {result['seed']}: {status} in {result['time']:.1f}s")
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+    return results
+
+def make_batch_jobs(instances, seeds, schedules, moves='random', initial_tour='random'):
+    
+    # Cartesian product of instances x seeds x (initial_temp, cooling_rate, stopping_temp).
+    return [{'instance': instance, 'seed': seed, 'initial_temp': initial_temp,
+             'cooling_rate': cooling_rate, 'stopping_temp': stopping_temp, 'moves': moves,
+             'initial_tour': initial_tour}
+            for instance in instances
+            for seed in seeds
+            for initial_temp, cooling_rate, stopping_temp in schedules]
 
 if __name__ == '__main__':
   
@@ -85,15 +883,38 @@ if __name__ == '__main__':
     COOLING_RATE = 0.999
     STOPPING_TEMP = 1e-3
 
-    for tsp_file in filenames:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', metavar='RESULTS.jsonl',
+                        help="run headless on a process pool, streaming results to this file")
+    parser.add_argument('--instances', nargs='+', default=filenames)
+    parser.add_argument('--seeds', type=int, default=1)
+    parser.add_argument('--cooling-rates', type=float, nargs='+', default=[COOLING_RATE])
+    parser.add_argument('--moves', choices=['random', 'neighbor'], default='random')
+    parser.add_argument('--initial-tour', choices=INITIAL_TOUR_METHODS, default='random')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.batch:
+        jobs = make_batch_jobs(args.instances, range(args.seeds),
+                               [(INITIAL_TEMP, rate, STOPPING_TEMP) for rate in args.cooling_rates],
+                               args.moves, args.initial_tour)
+        start_time = time.time()
+        batch_results = run_batch(jobs, args.batch, args.workers)
+        print(f"{len(batch_results)} runs written to {args.batch}. Time taken: {time.time() - start_time:.1f}s")
+        raise SystemExit
+
+    for tsp_file in args.instances:
         print(f"\nSolving {tsp_file} ")
         try:
-            coordinates = parse_tsp_file(tsp_file)
+            coordinates, header = load_tsplib(tsp_file)
+            metric = tsplib_metric(header)
+            print(f"Parsed {len(coordinates)} coordinates from {tsp_file}.")
             
-            print(f"Running Simulated Annealing for {len(coordinates)} cities...")
+            print(f"Running Simulated Annealing for {len(coordinates)} cities ({metric})...")
             
-            final_solution, final_cost = simulated_annealing_tsp(
-                coordinates, INITIAL_TEMP, COOLING_RATE, STOPPING_TEMP
+            final_solution, final_cost, _ = simulated_annealing_tsp(
+                coordinates, INITIAL_TEMP, COOLING_RATE, STOPPING_TEMP, metric=metric,
+                initial_tour=args.initial_tour
             )
             
             results[tsp_file] = final_cost
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import random
 import math
 import time
+import heapq
 
 def load_octave_text_matrix(filename):
     
@@ -16,51 +17,331 @@ def load_octave_text_matrix(filename):
             break
     if data_start_index == 0:
         raise ValueError("Could not find '# ndims:' header in file.")
+    # The line after '# ndims:' holds the dimensions; the data is stored
+    # column-major, so the result is the transpose (callers apply .T).
+    dims = tuple(int(d) for d in all_lines[data_start_index - 1].split())
     data_lines_only = [line.strip() for line in all_lines[data_start_index:]]
     image_flat = np.fromstring(" ".join(data_lines_only), dtype=np.uint8, sep=' ')
-    image_dim = 512
-    if image_flat.size != image_dim * image_dim:
-        raise ValueError(f"Data size mismatch! Expected {image_dim*image_dim}, found {image_flat.size}.")
-    return image_flat.reshape((image_dim, image_dim))
+    if image_flat.size != np.prod(dims):
+        raise ValueError(f"Data size mismatch! Expected {np.prod(dims)}, found {image_flat.size}.")
+    return image_flat.reshape(dims[::-1])
+
+# Seam table and orientation of the left, right, up and down seams of a
+# position (twice, for both swapped positions): is the centre block the
+# left/top one?
+_SEAM_KIND = np.array([0, 0, 1, 1, 0, 0, 1, 1])
+_CENTER_FIRST = np.array([False, True, False, True, False, True, False, True])
 
 class JigsawSolver:
     
     def __init__(self, scrambled_image, grid=4):
         self.scrambled_image = scrambled_image
+        # grid is the pieces per side, or (rows, cols) for a non-square grid.
         self.grid = grid
+        self.rows, self.cols = (grid, grid) if isinstance(grid, int) else grid
         self.blocks, self.block_size = self._split_into_blocks()
         self.num_blocks = len(self.blocks)
         self.perm = list(range(self.num_blocks))
+        self.seam_table = self._edge_dissimilarities()
+        self.right_cost = self.seam_table[0, :self.num_blocks, :self.num_blocks]
+        self.down_cost = self.seam_table[1, :self.num_blocks, :self.num_blocks]
+        self.position_seams = self._build_position_seams()
+        self.neighbor_positions = self._build_neighbor_positions()
 
     def _split_into_blocks(self):
        
         h, w = self.scrambled_image.shape
-        bh, bw = h // self.grid, w // self.grid
+        bh, bw = h // self.rows, w // self.cols
         blocks = []
-        for i in range(self.grid):
-            for j in range(self.grid):
+        for i in range(self.rows):
+            for j in range(self.cols):
                 blocks.append(self.scrambled_image[i*bh:(i+1)*bh, j*bw:(j+1)*bw])
         return blocks, (bh, bw)
 
-    def _calculate_energy(self, perm):
-       
-        total = 0.0
-        grid_blocks = [[self.blocks[perm[i*self.grid + j]] for j in range(self.grid)] for i in range(self.grid)]
+    def _edge_dissimilarities(self, chunk=256):
         
+        # table[0, a, b]: seam cost of block b placed right of block a;
+        # table[1, a, b]: of b placed below a. Index num_blocks is an empty
+        # block off the edge of the grid that costs nothing. Rows are
+        # filled a chunk at a time so the broadcast stays small on large grids.
+        blocks = np.stack(self.blocks).astype(np.int32)
+        table = np.zeros((2, self.num_blocks + 1, self.num_blocks + 1), dtype=np.int32)
+        for kind, (first, second) in enumerate(((blocks[:, :, -1], blocks[:, :, 0]), (blocks[:, -1, :], blocks[:, 0, :]))):
+            for start in range(0, self.num_blocks, chunk):
+                stop = min(start + chunk, self.num_blocks)
+                table[kind, start:stop, :self.num_blocks] = np.abs(first[start:stop, np.newaxis, :] - second[np.newaxis, :, :]).sum(axis=2)
+        return table
+
+    def _build_position_seams(self):
         
-        for i in range(self.grid):
-            for j in range(self.grid - 1):
-                a, b = grid_blocks[i][j], grid_blocks[i][j+1]
-                total += np.sum(np.abs(a[:, -1].astype(np.int32) - b[:, 0].astype(np.int32)))
+        # Seams touching each grid position, as (table, left/top, right/bottom).
+        seams = [[] for _ in range(self.num_blocks)]
+        for i in range(self.rows):
+            for j in range(self.cols):
+                pos = i*self.cols + j
+                if j + 1 < self.cols:
+                    seam = (0, pos, pos + 1)
+                    seams[pos].append(seam)
+                    seams[pos + 1].append(seam)
+                if i + 1 < self.rows:
+                    seam = (1, pos, pos + self.cols)
+                    seams[pos].append(seam)
+                    seams[pos + self.cols].append(seam)
+        return seams
+
+    def _build_neighbor_positions(self):
         
+        # Left, right, up and down neighbour of each position, or num_blocks
+        # (the empty block) past the edge of the grid.
+        rows, cols = np.divmod(np.arange(self.num_blocks), self.cols)
+        off = self.num_blocks
+        return np.stack([np.where(cols > 0, np.arange(self.num_blocks) - 1, off),
+                         np.where(cols < self.cols - 1, np.arange(self.num_blocks) + 1, off),
+                         np.where(rows > 0, np.arange(self.num_blocks) - self.cols, off),
+                         np.where(rows < self.rows - 1, np.arange(self.num_blocks) + self.cols, off)], axis=1)
+
+    def _calculate_energy(self, perm):
        
-        for i in range(self.grid - 1):
-            for j in range(self.grid):
-                a, b = grid_blocks[i][j], grid_blocks[i+1][j]
-                total += np.sum(np.abs(a[-1, :].astype(np.int32) - b[0, :].astype(np.int32)))
-                
+        placed = np.asarray(perm).reshape(self.rows, self.cols)
+        total = self.right_cost[placed[:, :-1], placed[:, 1:]].sum()
+        total += self.down_cost[placed[:-1, :], placed[1:, :]].sum()
         return float(total)
 
+    def _swap_delta(self, perm, a, b):
+        
+        # Energy change from swapping positions a and b: only the (at most
+        # eight) seams around the two positions are rescored.
+        seams = set(self.position_seams[a]).union(self.position_seams[b])
+        tables = (self.right_cost, self.down_cost)
+        before = sum(tables[kind][perm[p], perm[q]] for kind, p, q in seams)
+        perm[a], perm[b] = perm[b], perm[a]
+        after = sum(tables[kind][perm[p], perm[q]] for kind, p, q in seams)
+        perm[a], perm[b] = perm[b], perm[a]
+        return float(after - before)
+
+    def _batched_swap_delta(self, perms, a, b):
+        
+        # _swap_delta for every chain at once. perms is (K, num_blocks + 1)
+        # with the empty block in the last column; chain k swaps positions
+        # a[k] and b[k]. Columns 0-3 score the seams around a, 4-7 those
+        # around b, skipping b's seam to a so a shared seam counts once.
+        rows = np.arange(len(perms))[:, np.newaxis]
+        here = np.concatenate([np.repeat(a[:, np.newaxis], 4, axis=1), np.repeat(b[:, np.newaxis], 4, axis=1)], axis=1)
+        there = np.concatenate([np.repeat(b[:, np.newaxis], 4, axis=1), np.repeat(a[:, np.newaxis], 4, axis=1)], axis=1)
+        neighbors = np.concatenate([self.neighbor_positions[a], self.neighbor_positions[b]], axis=1)
+        block = perms[rows, here]
+        moved = perms[rows, there]
+        beside = perms[rows, neighbors]
+        beside_after = np.where(neighbors == there, block, beside)
+        before = self.seam_table[_SEAM_KIND, np.where(_CENTER_FIRST, block, beside), np.where(_CENTER_FIRST, beside, block)]
+        after = self.seam_table[_SEAM_KIND, np.where(_CENTER_FIRST, moved, beside_after), np.where(_CENTER_FIRST, beside_after, moved)]
+        change = after - before
+        change[:, 4:][neighbors[:, 4:] == there[:, 4:]] = 0
+        return change.sum(axis=1).astype(np.float64)
+
+    def solve_batched(self, num_chains, initial_temp, cooling_rate,
+                      iter_per_temp, max_steps, seed,
+                      tempering=False, temp_spread=10.0, exchange_every=10):
+        
+        # Advances num_chains permutations together as a (K, num_blocks)
+        # array, all starting from self.perm; proposals, deltas and
+        # Metropolis acceptance are vectorised across chains, and one step
+        # is one proposal per chain. With tempering, chain k runs at
+        # temp * temp_spread ** (k / (K - 1)) and neighbouring chains try to
+        # exchange states every exchange_every steps.
+        rng = np.random.default_rng(seed)
+        K, N = num_chains, self.num_blocks
+        perms = np.tile(np.append(np.asarray(self.perm, dtype=np.int64), N), (K, 1))
+        energies = np.full(K, self._calculate_energy(self.perm))
+        best_energy = float(energies[0])
+        best_perm = perms[0, :N].copy()
+        if tempering and K > 1:
+            ladder = temp_spread ** (np.arange(K) / (K - 1))
+        else:
+            ladder = np.ones(K)
+        rows = np.arange(K)
+
+        print(f"Initial adjacency energy: {best_energy:.0f} ({K} chains)")
+        temp = initial_temp
+        step = 0
+        exchanges = 0
+
+        while step < max_steps and temp > 0.1:
+            # Random draws for the whole temperature level at once.
+            firsts = rng.integers(N, size=(iter_per_temp, K))
+            seconds = (firsts + rng.integers(1, N, size=(iter_per_temp, K))) % N
+            thresholds = -np.log(rng.random((iter_per_temp, K))) * temp * ladder
+            for it in range(iter_per_temp):
+                if step >= max_steps: break
+
+                a, b = firsts[it], seconds[it]
+                dE = self._batched_swap_delta(perms, a, b)
+                # dE < -T log(u) is the Metropolis test u < exp(-dE / T).
+                accept = dE < thresholds[it]
+                idx = rows[accept]
+                if idx.size:
+                    moved = perms[idx, a[idx]]
+                    perms[idx, a[idx]] = perms[idx, b[idx]]
+                    perms[idx, b[idx]] = moved
+                    energies[idx] += dE[idx]
+                    k = int(np.argmin(energies))
+                    if energies[k] < best_energy:
+                        best_energy = float(energies[k])
+                        best_perm = perms[k, :N].copy()
+
+                if tempering and K > 1 and step % exchange_every == 0:
+                    # Alternate even and odd neighbour pairs.
+                    low = np.arange((step // exchange_every) % 2, K - 1, 2)
+                    high = low + 1
+                    betas = 1.0 / (temp * ladder)
+                    log_accept = (energies[low] - energies[high]) * (betas[low] - betas[high])
+                    swap = np.log(rng.random(len(low))) < log_accept
+                    low, high = low[swap], high[swap]
+                    perms[np.concatenate([low, high])] = perms[np.concatenate([high, low])]
+                    energies[np.concatenate([low, high])] = energies[np.concatenate([high, low])]
+                    exchanges += len(low)
+
+                step += 1
+
+            temp *= cooling_rate
+
+        print(f"\nFinished. Final best energy: {best_energy:.0f}" + (f" ({exchanges} exchanges)" if tempering else ""))
+        return best_perm.tolist(), best_energy
+
+    def _prediction_dissimilarities(self, chunk=256):
+        
+        # Compatibility used by solve_greedy: table[0, a, b] compares each
+        # side of the a|b seam with the other side's edge extrapolated one
+        # pixel, so smooth gradients across the seam are not penalised.
+        # Summed one pixel column at a time over contiguous rows; the
+        # diagonal is inf.
+        blocks = np.stack(self.blocks).astype(np.float32)
+        table = np.zeros((2, self.num_blocks, self.num_blocks), dtype=np.float32)
+        for kind, oriented in enumerate((blocks, blocks.transpose(0, 2, 1))):
+            last, first = oriented[:, :, -1], oriented[:, :, 0]
+            ahead = np.concatenate([2 * last - oriented[:, :, -2], last], axis=1)
+            behind = np.ascontiguousarray(np.concatenate([first, 2 * first - oriented[:, :, 1]], axis=1).T)
+            for start in range(0, self.num_blocks, chunk):
+                rows = table[kind, start:start + chunk]
+                for d in range(len(behind)):
+                    rows += np.abs(ahead[start:start + chunk, d, np.newaxis] - behind[d])
+            np.fill_diagonal(table[kind], np.inf)
+        return table
+
+    def _best_buddies(self, table):
+        
+        # right_buddy[a] = b when b is a's best right-hand match in table and
+        # a is b's best left-hand match, else -1; down_buddy likewise.
+        everyone = np.arange(self.num_blocks)
+        buddies = []
+        for kind in range(2):
+            best_after = table[kind].argmin(axis=1)
+            best_before = table[kind].argmin(axis=0)
+            buddies.append(np.where(best_before[best_after] == everyone, best_after, -1))
+        return buddies[0], buddies[1]
+
+    def solve_greedy(self, seed_piece=None):
+        
+        # Grow the picture from a seed piece on an open canvas, keep the
+        # rows x cols window holding the most pieces, then refill the window.
+        # Each open slot is offered its best unplaced piece; the heap places
+        # best buddies first, then slots with two or more placed neighbours,
+        # then the most confident offer (lowest best / runner-up cost).
+        # Costs are divided by the neighbour's own runner-up cost. Sets
+        # self.perm so solve and solve_batched start from the result.
+        N = self.num_blocks
+        everyone = np.arange(N)
+        table = self._prediction_dissimilarities()
+        right_buddy, down_buddy = self._best_buddies(table)
+        left_buddy = np.full(N, -1)
+        up_buddy = np.full(N, -1)
+        left_buddy[right_buddy[right_buddy >= 0]] = everyone[right_buddy >= 0]
+        up_buddy[down_buddy[down_buddy >= 0]] = everyone[down_buddy >= 0]
+        if seed_piece is None:
+            buddy_count = (right_buddy >= 0).astype(int) + (left_buddy >= 0) + (down_buddy >= 0) + (up_buddy >= 0)
+            seed_piece = int(np.argmax(buddy_count))
+        # (offset of the placed neighbour, its costs against every piece,
+        # its runner-up cost, its buddy on this side)
+        sides = []
+        for kind, (after, before) in enumerate(((right_buddy, left_buddy), (down_buddy, up_buddy))):
+            offset = np.array([0, 1]) if kind == 0 else np.array([1, 0])
+            sides.append((tuple(-offset), table[kind], np.partition(table[kind], 1, axis=1)[:, 1], after))
+            sides.append((tuple(offset), table[kind].T, np.partition(table[kind], 1, axis=0)[1], before))
+
+        def grow(canvas, fits):
+            unplaced = np.ones(N, dtype=bool)
+            unplaced[list(canvas.values())] = False
+            heap = []
+            versions = {}
+
+            def offer(slot):
+                r, c = slot
+                cost = np.zeros(N)
+                buddy = np.ones(N, dtype=bool)
+                count = 0
+                for (dr, dc), costs, second, buddies in sides:
+                    piece = canvas.get((r + dr, c + dc))
+                    if piece is not None:
+                        cost += costs[piece] / max(float(second[piece]), 1e-9)
+                        buddy &= everyone == buddies[piece]
+                        count += 1
+                cost[~unplaced] = np.inf
+                if unplaced.sum() > 1:
+                    best, second = np.argpartition(cost, 1)[:2]
+                    if cost[second] < cost[best]:
+                        best, second = second, best
+                    confidence = (cost[best] + 1e-9) / (cost[second] + 1e-9)
+                else:
+                    best, confidence = int(np.argmin(cost)), 0.0
+                versions[slot] = versions.get(slot, 0) + 1
+                heapq.heappush(heap, (not buddy[best], count == 1, confidence, versions[slot], slot, int(best)))
+
+            def offer_around(slot):
+                r, c = slot
+                for neighbor_slot in ((r, c - 1), (r, c + 1), (r - 1, c), (r + 1, c)):
+                    if neighbor_slot not in canvas and fits(neighbor_slot):
+                        offer(neighbor_slot)
+
+            for slot in list(canvas):
+                offer_around(slot)
+            while len(canvas) < N:
+                _, _, _, version, slot, piece = heapq.heappop(heap)
+                if slot in canvas or versions[slot] != version:
+                    continue
+                if not unplaced[piece]:
+                    offer(slot)
+                    continue
+                canvas[slot] = piece
+                unplaced[piece] = False
+                offer_around(slot)
+
+        canvas = {(0, 0): seed_piece}
+        grow(canvas, lambda slot: True)
+
+        # Count the pieces in every rows x cols window over the canvas with
+        # a summed-area table and keep only those in the fullest one.
+        r0 = min(r for r, c in canvas) - self.rows + 1
+        c0 = min(c for r, c in canvas) - self.cols + 1
+        occupied = np.zeros((max(r for r, c in canvas) - r0 + 1, max(c for r, c in canvas) - c0 + 1), dtype=int)
+        for r, c in canvas:
+            occupied[r - r0, c - c0] = 1
+        area = np.pad(occupied.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+        window = (area[self.rows:, self.cols:] - area[:-self.rows, self.cols:]
+                  - area[self.rows:, :-self.cols] + area[:-self.rows, :-self.cols])
+        top, left = np.unravel_index(np.argmax(window), window.shape)
+        top, left = int(top) + r0, int(left) + c0
+        canvas = {(r, c): piece for (r, c), piece in canvas.items()
+                  if top <= r < top + self.rows and left <= c < left + self.cols}
+        grow(canvas, lambda slot: top <= slot[0] < top + self.rows and left <= slot[1] < left + self.cols)
+
+        perm = [0] * N
+        for (r, c), piece in canvas.items():
+            perm[(r - top) * self.cols + (c - left)] = piece
+        self.perm = perm
+        energy = self._calculate_energy(perm)
+        print(f"Greedy placement energy: {energy:.0f}")
+        return perm[:], energy
+
     def solve(self, initial_temp, cooling_rate,
               iter_per_temp, max_steps, seed,
               visualize_every):
@@ -85,18 +366,14 @@ class JigsawSolver:
                 if step >= max_steps: break
                 
                 a, b = random.sample(range(self.num_blocks), 2)
-                self.perm[a], self.perm[b] = self.perm[b], self.perm[a]
-                
-                prop_energy = self._calculate_energy(self.perm)
-                dE = prop_energy - current_energy
+                dE = self._swap_delta(self.perm, a, b)
                 
                 if dE < 0 or (temp > 1e-9 and random.random() < math.exp(-dE / temp)):
-                    current_energy = prop_energy
+                    self.perm[a], self.perm[b] = self.perm[b], self.perm[a]
+                    current_energy += dE
                     if current_energy < best_energy:
                         best_energy = current_energy
                         best_perm = self.perm[:]
-                else:
-                    self.perm[a], self.perm[b] = self.perm[b], self.perm[a]
                 
                 step += 1
 
@@ -122,10 +399,10 @@ class JigsawSolver:
     def stitch_image(self, perm):
        
         bh, bw = self.block_size
-        img = np.zeros((self.grid*bh, self.grid*bw), dtype=self.blocks[0].dtype)
+        img = np.zeros((self.rows*bh, self.cols*bw), dtype=self.blocks[0].dtype)
         idx = 0
-        for i in range(self.grid):
-            for j in range(self.grid):
+        for i in range(self.rows):
+            for j in range(self.cols):
                 img[i*bh:(i+1)*bh, j*bw:(j+1)*bw] = self.blocks[perm[idx]]
                 idx += 1
         return img
@@ -137,7 +414,10 @@ if __name__ == "__main__":
         if scrambled_image is not None:
             solver = JigsawSolver(scrambled_image, grid=4)
 
-          
+            # Start annealing from the greedy placement instead of the
+            # scrambled order.
+            solver.solve_greedy()
+
             best_perm, best_energy = solver.solve(
                 initial_temp=5500.0,       
                 cooling_rate=0.999,        